@@ -1,9 +1,6 @@
 """
-Pytest configuration and fixtures for Infinite Story Web tests.
-"""
-
-import sys
-import os
+Pytest configuration for Infinite Story Web tests.
 
-# Add src directory to Python path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+The repository root is put on the import path by the ``pythonpath``
+setting in pytest.ini, and the shared fixtures live in tests/conftest.py.
+"""
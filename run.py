@@ -4,27 +4,49 @@ Infinite Story Web - Application Entry Point
 
 This is the main entry point for running the Infinite Story Web application.
 It initializes the Flask server with WebSocket support.
+
+Importing this module has no side effects: the environment is patched and
+the application is built only when main() runs.
 """
 
 import os
 import sys
 
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from dotenv import dotenv_values
+
+
+BANNER = """
+    ╔══════════════════════════════════════════════════════════╗
+    ║           Infinite Story Web - Starting Server           ║
+    ╠══════════════════════════════════════════════════════════╣
+    ║  Host: {host:<50} ║
+    ║  Port: {port:<50} ║
+    ║  Debug: {debug:<49} ║
+    ║                                                          ║
+    ║  Open http://localhost:{port} in your browser             ║
+    ╚══════════════════════════════════════════════════════════╝
+    """
 
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+def _patch_for_eventlet() -> None:
+    """Green the standard library if SocketIO runs on eventlet.
 
-from src.backend.server import app, socketio
+    Must run before Flask or anything that opens sockets is imported, so
+    the async mode is read straight from the environment and .env file
+    rather than from the application settings.
+    """
+    env = {**dotenv_values(), **os.environ}
+    if (env.get('SOCKETIO_ASYNC_MODE') or 'eventlet') == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
 
 
 def main():
     """Run the Infinite Story Web application.
 
     Initializes and starts the Flask server with WebSocket support.
-    Server configuration is read from environment variables.
+    Server configuration is read from the application settings, which
+    are parsed once from environment variables and the .env file.
 
     Environment Variables:
         HOST: The host address to bind to. Defaults to '0.0.0.0'.
@@ -34,24 +56,25 @@ def main():
     Returns:
         None
     """
-    host = os.environ.get('HOST', '0.0.0.0')
-    port = int(os.environ.get('PORT', 5000))
-    debug = os.environ.get('FLASK_DEBUG', '0') == '1'
+    _patch_for_eventlet()
     
-    print(f"""
-    ╔══════════════════════════════════════════════════════════╗
-    ║           Infinite Story Web - Starting Server           ║
-    ╠══════════════════════════════════════════════════════════╣
-    ║  Host: {host:<50} ║
-    ║  Port: {port:<50} ║
-    ║  Debug: {str(debug):<49} ║
-    ║                                                          ║
-    ║  Open http://localhost:{port} in your browser             ║
-    ╚══════════════════════════════════════════════════════════╝
-    """)
+    from src.backend.config import settings
+    from src.backend.server import create_app, create_socketio
+    
+    host = settings.host
+    port = settings.port
+    debug = settings.debug
+    
+    app = create_app()
+    socketio = create_socketio(app)
+    
+    print(BANNER.format(host=host, port=port, debug=str(debug)))
     
     socketio.run(app, host=host, port=port, debug=debug)
 
 
 if __name__ == '__main__':
+    if __package__ is None:
+        # Running as a script: make the project root importable
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
     main()
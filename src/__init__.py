@@ -2,8 +2,7 @@
 Source package for Infinite Story Web.
 """
 
-from .backend import StoryGenerator, Mood, Genre, create_app
-from .database import DatabaseManager, User, StorySegment, Interaction, MergeRequest
+from .backend import StoryGenerator, Mood, Genre
 
 __all__ = [
     'StoryGenerator',
@@ -16,3 +15,16 @@ __all__ = [
     'Interaction',
     'MergeRequest'
 ]
+
+_DATABASE_NAMES = frozenset(('DatabaseManager', 'User', 'StorySegment', 'Interaction', 'MergeRequest'))
+
+
+def __getattr__(name):
+    """Import the server and database layers on first access."""
+    if name == 'create_app':
+        from .backend import create_app
+        return create_app
+    if name in _DATABASE_NAMES:
+        from . import database
+        return getattr(database, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,7 +6,6 @@ and WebSocket handlers for real-time collaborative features.
 """
 
 from .story_generator import StoryGenerator, Mood, Genre, StoryContext
-from .server import create_app, create_socketio, app, socketio
 
 __all__ = [
     'StoryGenerator',
@@ -15,6 +14,19 @@ __all__ = [
     'StoryContext',
     'create_app',
     'create_socketio',
+    'application_factory',
     'app',
     'socketio'
 ]
+
+# Served from the server module, which is only imported (along with Flask
+# and SQLAlchemy) the first time one of these names is looked up
+_SERVER_NAMES = frozenset(('create_app', 'create_socketio', 'application_factory', 'app', 'socketio'))
+
+
+def __getattr__(name):
+    """Resolve the server factories and default ``app`` on first access."""
+    if name in _SERVER_NAMES:
+        from . import server
+        return getattr(server, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
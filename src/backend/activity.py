@@ -0,0 +1,195 @@
+"""
+Infinite Story Web - Activity Buffers
+
+This module batches user activity timestamps and interaction records in
+memory and writes them to the database periodically, instead of issuing
+a statement per interaction.
+"""
+
+import atexit
+import logging
+import threading
+import weakref
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from ..database.models import DatabaseManager
+
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_INTERACTION_BATCH = 64
+
+logger = logging.getLogger(__name__)
+
+_live_buffers: 'weakref.WeakSet[Union[ActivityBuffer, InteractionBuffer]]' = weakref.WeakSet()
+
+
+class ActivityBuffer:
+    """Write-behind buffer for the users' last active timestamps.
+
+    Recording activity only updates an in-memory dictionary. The first
+    record after a flush schedules the next one, so no thread is kept
+    alive while there is nothing to write.
+    """
+
+    def __init__(self, db: DatabaseManager, interval: float = DEFAULT_FLUSH_INTERVAL):
+        """Initialize the buffer.
+
+        Args:
+            db: The database manager to flush timestamps to.
+            interval: Seconds to wait after the first record before flushing.
+        """
+        self.db = db
+        self.interval = interval
+        self._pending: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        _live_buffers.add(self)
+
+    def record(self, user_id: str) -> None:
+        """Mark a user as active now.
+
+        Args:
+            user_id: The unique user identifier.
+        """
+        with self._lock:
+            self._pending[user_id] = datetime.utcnow()
+            self._schedule()
+
+    def _schedule(self) -> None:
+        """Arm the flush timer unless it is already armed. Caller holds the lock."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> int:
+        """Write all pending timestamps in a single UPDATE.
+
+        If the write fails, the timestamps are queued again, behind any
+        newer ones recorded meanwhile, and the next flush retries them.
+
+        Returns:
+            int: The number of users whose activity was written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return 0
+        try:
+            self.db.update_users_activity(pending)
+        except Exception:
+            logger.exception('Failed to write the activity of %d users', len(pending))
+            with self._lock:
+                for user_id, timestamp in pending.items():
+                    self._pending.setdefault(user_id, timestamp)
+                self._schedule()
+            return 0
+        return len(pending)
+
+
+class InteractionBuffer:
+    """Write-behind buffer for interaction records.
+
+    Interactions are queued in memory and inserted in bulk, either once
+    batch_size of them are queued or interval seconds after the first
+    one, whichever comes first. A batch size of 1 writes every
+    interaction immediately.
+    """
+
+    def __init__(self, db: DatabaseManager, batch_size: int = DEFAULT_INTERACTION_BATCH,
+                 interval: float = DEFAULT_FLUSH_INTERVAL):
+        """Initialize the buffer.
+
+        Args:
+            db: The database manager to write interactions to.
+            batch_size: Number of queued interactions that triggers a write.
+            interval: Seconds to wait after the first record before flushing.
+        """
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        _live_buffers.add(self)
+
+    def record(self, user_id: str, interaction_type: str,
+               data: Optional[Dict[str, Any]] = None) -> None:
+        """Queue an interaction, timestamped now.
+
+        Args:
+            user_id: The ID of the user performing the interaction.
+            interaction_type: The type of interaction (e.g., 'scroll', 'click').
+            data: Optional dictionary containing additional interaction details.
+        """
+        row = {
+            'user_id': user_id,
+            'interaction_type': interaction_type,
+            'data': data,
+            'timestamp': datetime.utcnow()
+        }
+        with self._lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Insert all queued interactions in a single transaction.
+
+        Returns:
+            int: The number of interactions written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return 0
+        try:
+            self.db.record_interactions(pending)
+        except Exception:
+            # One bad row fails the whole batch, so retry the rows one by one
+            logger.exception('Failed to write %d interactions as a batch', len(pending))
+            return self._record_each(pending)
+        return len(pending)
+
+    def _record_each(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert interactions one at a time, dropping rows that fail.
+
+        Args:
+            rows: The interaction rows of a batch that failed as a whole.
+
+        Returns:
+            int: The number of interactions written.
+        """
+        written = 0
+        for row in rows:
+            try:
+                self.db.record_interactions([row])
+            except Exception:
+                logger.exception('Dropping an interaction of user %s', row['user_id'])
+            else:
+                written += 1
+        return written
+
+
+def _flush_all() -> None:
+    """Flush every live buffer before the interpreter exits."""
+    for buffer in list(_live_buffers):
+        buffer.flush()
+
+
+atexit.register(_flush_all)
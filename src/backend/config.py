@@ -0,0 +1,74 @@
+"""
+Infinite Story Web - Configuration
+
+This module reads the application settings once, at import time, from
+the process environment and an optional .env file.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from dotenv import dotenv_values
+
+from .activity import DEFAULT_FLUSH_INTERVAL, DEFAULT_INTERACTION_BATCH
+from .session_store import DEFAULT_MAX_SESSIONS, DEFAULT_SESSION_TTL
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable snapshot of the application settings."""
+    secret_key: str
+    database_url: str
+    redis_url: Optional[str]
+    session_ttl: int
+    max_sessions: int
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_recycle: int
+    db_pool_pre_ping: bool
+    activity_flush_interval: float
+    interaction_batch_size: int
+    host: str
+    port: int
+    debug: bool
+    async_mode: str
+
+    @classmethod
+    def from_env(cls, env: Optional[Dict[str, Optional[str]]] = None) -> 'Settings':
+        """Build settings from environment variables.
+
+        Args:
+            env: Optional mapping of variable names to values. Defaults to
+                the values of a .env file (if any) overridden by the process
+                environment. The .env file is read without modifying
+                os.environ.
+
+        Returns:
+            Settings: The parsed settings, with defaults for unset values.
+        """
+        if env is None:
+            env = {**dotenv_values(), **os.environ}
+
+        return cls(
+            secret_key=env.get('SECRET_KEY') or 'dev-secret-key',
+            database_url=env.get('DATABASE_URL') or 'sqlite:///stories.db',
+            redis_url=env.get('REDIS_URL') or None,
+            session_ttl=int(env.get('SESSION_TTL') or DEFAULT_SESSION_TTL),
+            max_sessions=int(env.get('MAX_SESSIONS') or DEFAULT_MAX_SESSIONS),
+            db_pool_size=int(env.get('DB_POOL_SIZE') or 50),
+            db_max_overflow=int(env.get('DB_MAX_OVERFLOW') or 100),
+            db_pool_recycle=int(env.get('DB_POOL_RECYCLE') or 1800),
+            db_pool_pre_ping=env.get('DB_POOL_PRE_PING', '0') == '1',
+            activity_flush_interval=float(env.get('ACTIVITY_FLUSH_INTERVAL')
+                                          or DEFAULT_FLUSH_INTERVAL),
+            interaction_batch_size=int(env.get('INTERACTION_BATCH_SIZE')
+                                       or DEFAULT_INTERACTION_BATCH),
+            host=env.get('HOST') or '0.0.0.0',
+            port=int(env.get('PORT') or 5000),
+            debug=env.get('FLASK_DEBUG', '0') == '1',
+            async_mode=env.get('SOCKETIO_ASYNC_MODE') or 'eventlet'
+        )
+
+
+settings = Settings.from_env()
@@ -0,0 +1,120 @@
+"""
+Infinite Story Web - JSON Serialization
+
+This module plugs orjson into Flask's JSON responses and into the
+encoding of Socket.IO packets.
+"""
+
+import decimal
+from typing import Any
+
+import orjson
+from flask import Response
+from flask.json.provider import JSONProvider
+
+
+def _default(o: Any) -> Any:
+    """Serialize the types Flask supports but orjson does not.
+
+    Args:
+        o: The object orjson could not serialize.
+
+    Returns:
+        Any: A serializable representation of the object.
+
+    Raises:
+        TypeError: If the object is not serializable.
+    """
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Installed as ``app.json``, it is used by jsonify and request.get_json.
+    Responses are built directly from the bytes orjson produces.
+    """
+
+    sort_keys = True
+
+    def _option(self) -> int:
+        """Get the orjson option flags for this provider.
+
+        Returns:
+            int: The combined orjson option flags.
+        """
+        return orjson.OPT_SORT_KEYS if self.sort_keys else 0
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON.
+
+        Args:
+            obj: The data to serialize.
+            **kwargs: Ignored; accepted for compatibility with json.dumps.
+
+        Returns:
+            str: The JSON document.
+        """
+        return orjson.dumps(obj, default=_default, option=self._option()).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """Deserialize data as JSON.
+
+        Args:
+            s: The JSON document as str or bytes.
+            **kwargs: Ignored; accepted for compatibility with json.loads.
+
+        Returns:
+            Any: The deserialized data.
+        """
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """Serialize the arguments into an application/json response.
+
+        Args:
+            *args: A single value to serialize, or several to serialize as a list.
+            **kwargs: Values to serialize as a dictionary.
+
+        Returns:
+            Response: The JSON response.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self._option())
+        return self._app.response_class(body, mimetype='application/json')
+
+
+class SocketIOJson:
+    """Drop-in for the json module used to encode Socket.IO packets."""
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        """Serialize a packet payload.
+
+        Args:
+            obj: The payload to serialize.
+            **kwargs: Ignored; e.g. the separators passed by python-socketio.
+
+        Returns:
+            str: The compact JSON document.
+        """
+        return orjson.dumps(obj, default=_default).decode()
+
+    @staticmethod
+    def loads(s: Any, **kwargs: Any) -> Any:
+        """Deserialize a packet payload.
+
+        Args:
+            s: The JSON document as str or bytes.
+            **kwargs: Ignored.
+
+        Returns:
+            Any: The deserialized payload.
+        """
+        return orjson.loads(s)
@@ -6,24 +6,49 @@ user sessions, story generation, and collaborative features.
 """
 
 import os
-import uuid
-import json
-from datetime import datetime
-from typing import Dict, Any, Optional
-
-from flask import Flask, request, jsonify, send_from_directory
+import functools
+import itertools
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import orjson
+from flask import (Blueprint, Flask, Response, current_app, request, jsonify,
+                   send_from_directory, stream_with_context)
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
 
-from .story_generator import StoryGenerator
-from ..database.models import DatabaseManager
+from .story_generator import StoryGenerator, MOOD_VALUES, GENRE_VALUES
+from .activity import ActivityBuffer, InteractionBuffer
+from .config import settings
+from .middleware import HealthShortcut
+from .serialization import OrjsonProvider, SocketIOJson
+from .session_store import create_session_store
+from ..database.models import DatabaseManager, User, StorySegment
+
+
+REBUILD_SEGMENTS = 10
+STORY_CACHE_MAX_LIMIT = 100
+MAX_INTERACTION_TYPE_LENGTH = 50
+
+SESSION_ID_BYTES = 16
+SESSION_ID_BATCH = 64
+
+_session_ids: List[str] = []
+_session_id_lock = threading.Lock()
 
+if hasattr(os, 'register_at_fork'):
+    # A forked worker must not hand out the ids pooled by its parent
+    os.register_at_fork(after_in_child=_session_ids.clear)
 
-def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
+
+def create_app(config: Optional[Dict[str, Any]] = None,
+               db: Optional[DatabaseManager] = None) -> Flask:
     """Create and configure the Flask application.
     
     Args:
         config: Optional configuration dictionary
+        db: Optional database manager to use instead of building one from
+            DATABASE_URL. Its tables must already exist.
         
     Returns:
         Configured Flask application
@@ -31,10 +56,23 @@ def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
     app = Flask(__name__, 
                 static_folder='../frontend',
                 static_url_path='')
+    app.json = OrjsonProvider(app)
+    app.json.sort_keys = False
+    app.url_map.strict_slashes = False
     
     # Apply configuration
-    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
-    app.config['DATABASE_URL'] = os.environ.get('DATABASE_URL', 'sqlite:///stories.db')
+    app.config['SECRET_KEY'] = settings.secret_key
+    app.config['DATABASE_URL'] = settings.database_url
+    app.config['REDIS_URL'] = settings.redis_url
+    app.config['SESSION_TTL'] = settings.session_ttl
+    app.config['MAX_SESSIONS'] = settings.max_sessions
+    app.config['DB_POOL_SIZE'] = settings.db_pool_size
+    app.config['DB_MAX_OVERFLOW'] = settings.db_max_overflow
+    app.config['DB_POOL_RECYCLE'] = settings.db_pool_recycle
+    app.config['DB_POOL_PRE_PING'] = settings.db_pool_pre_ping
+    app.config['ACTIVITY_FLUSH_INTERVAL'] = settings.activity_flush_interval
+    app.config['INTERACTION_BATCH_SIZE'] = settings.interaction_batch_size
+    app.config['SOCKETIO_ASYNC_MODE'] = settings.async_mode
     
     if config:
         app.config.update(config)
@@ -42,16 +80,33 @@ def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
     # Enable CORS
     CORS(app)
     
+    # Answer health checks before Flask dispatch
+    app.wsgi_app = HealthShortcut(app.wsgi_app)
+    
     # Initialize database
-    db = DatabaseManager(app.config['DATABASE_URL'])
-    db.create_tables()
+    if db is None:
+        db = DatabaseManager(app.config['DATABASE_URL'], engine_kwargs={
+            'pool_size': app.config['DB_POOL_SIZE'],
+            'max_overflow': app.config['DB_MAX_OVERFLOW'],
+            'pool_recycle': app.config['DB_POOL_RECYCLE'],
+            'pool_pre_ping': app.config['DB_POOL_PRE_PING'],
+            'echo_pool': app.debug
+        })
+        db.create_tables()
     app.db = db
     
-    # Store active story generators per session
-    app.generators: Dict[str, StoryGenerator] = {}
+    # Batch last-active updates instead of writing one per interaction
+    app.activity = ActivityBuffer(db, interval=app.config['ACTIVITY_FLUSH_INTERVAL'])
+    app.interactions = InteractionBuffer(db, batch_size=app.config['INTERACTION_BATCH_SIZE'],
+                                         interval=app.config['ACTIVITY_FLUSH_INTERVAL'])
+    
+    # Store story generators and cached users per session
+    app.session_store = create_session_store(app.config['REDIS_URL'],
+                                             ttl=app.config['SESSION_TTL'],
+                                             max_sessions=app.config['MAX_SESSIONS'])
     
     # Register routes
-    register_routes(app)
+    app.register_blueprint(api)
     
     return app
 
@@ -59,426 +114,621 @@ def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
 def create_socketio(app: Flask) -> SocketIO:
     """Create and configure SocketIO for real-time features.
     
+    When REDIS_URL is configured it doubles as the message queue, so
+    emits to a room reach clients connected to any worker process.
+    Story updates are emitted by a background task reading from
+    app.emit_queue, so event handlers never wait on socket writes.
+    
     Args:
         app: Flask application instance
         
     Returns:
         Configured SocketIO instance
     """
-    socketio = SocketIO(app, cors_allowed_origins="*")
+    socketio = SocketIO(app, cors_allowed_origins="*",
+                        async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+                        message_queue=app.config['REDIS_URL'],
+                        json=SocketIOJson)
+    
+    # A queue type matching the async mode, e.g. green for eventlet
+    app.emit_queue = socketio.server.eio.create_queue()
+    socketio.start_background_task(emit_worker, app, socketio)
+    
     register_socket_events(socketio, app)
     return socketio
 
 
-def register_routes(app: Flask) -> None:
-    """Register all HTTP routes.
+def emit_worker(app: Flask, socketio: SocketIO) -> None:
+    """Emit queued events to their rooms until the process exits.
+
+    Args:
+        app: Flask application instance owning the emit queue
+        socketio: SocketIO instance to emit through
+    """
+    while True:
+        event, data, room = app.emit_queue.get()
+        try:
+            socketio.emit(event, data, to=room)
+        except Exception:
+            app.logger.exception('Failed to emit %s to room %s', event, room)
+
+
+def new_session_id() -> str:
+    """Generate a random session identifier.
+
+    Random bytes are read from os.urandom in batches and split into
+    pre-encoded hex identifiers, so most calls only pop from a pool.
+
+    Returns:
+        str: A new identifier of SESSION_ID_BYTES random bytes in hex.
+    """
+    with _session_id_lock:
+        if not _session_ids:
+            block = os.urandom(SESSION_ID_BYTES * SESSION_ID_BATCH).hex()
+            step = SESSION_ID_BYTES * 2
+            _session_ids.extend(block[i:i + step] for i in range(0, len(block), step))
+        return _session_ids.pop()
+
+
+def get_user(app: Flask, session_id: str) -> Optional[User]:
+    """Get the user for a session through the session store cache.
+
+    Activity is buffered by app.activity rather than written per request,
+    so the cached record is kept across requests and its last_active may
+    lag behind the database.
+
+    Args:
+        app: Flask application instance
+        session_id: The unique session identifier
+
+    Returns:
+        Optional[User]: The user if the session exists, None otherwise
+    """
+    cached = app.session_store.get_user(session_id)
+    if cached is not None:
+        return User.from_dict(cached)
     
+    user = app.db.get_user_by_session(session_id)
+    if user:
+        app.session_store.set_user(session_id, user.to_dict())
+    return user
+
+
+def get_generator(app: Flask, session_id: str, create: bool = False,
+                  user: Optional[User] = None) -> Optional[StoryGenerator]:
+    """Get the story generator for a session.
+
+    Changes made to the returned generator are only persisted once it is
+    passed to save_generator.
+
     Args:
         app: Flask application instance
+        session_id: The unique session identifier
+        create: Whether to create a generator if none is stored
+        user: Optional session user. When given, a missing generator (e.g.
+            one evicted or expired from the session store) is rebuilt from
+            the user's most recent segments instead of starting blank.
+
+    Returns:
+        Optional[StoryGenerator]: The session's generator, or None if it has
+            none and create is False
     """
+    generator = app.session_store.get_generator(session_id)
+    if generator is None and create:
+        if user is not None:
+            segments = app.db.get_recent_segments(user.id, limit=REBUILD_SEGMENTS)
+            generator = StoryGenerator.from_segments([s.content for s in segments],
+                                                     story_length=app.db.count_story_words(user.id))
+        else:
+            generator = StoryGenerator()
+    return generator
+
+
+def save_generator(app: Flask, session_id: str, generator: StoryGenerator) -> None:
+    """Persist the story generator for a session.
+
+    Args:
+        app: Flask application instance
+        session_id: The unique session identifier
+        generator: The generator to store
+    """
+    app.session_store.save_generator(session_id, generator)
+
+
+def cached_context(app: Flask, session_id: str, generator: Optional[StoryGenerator]) -> Optional[Dict[str, Any]]:
+    """Get the context summary for a session, reusing a cached copy.
+
+    The cached summary is dropped by save_generator, so it is only
+    recomputed after the generator has actually changed.
+
+    Args:
+        app: Flask application instance
+        session_id: The unique session identifier
+        generator: The session's generator, or None if it has none
+
+    Returns:
+        Optional[Dict[str, Any]]: The context summary, or None if the
+            session has no generator
+    """
+    if generator is None:
+        return None
     
-    @app.route('/')
-    def index():
-        """Serve the main page.
+    context = app.session_store.get_context(session_id)
+    if context is None:
+        context = generator.get_context_summary()
+        app.session_store.set_context(session_id, context)
+    return context
 
-        Returns:
-            Response: The index.html file from the static folder.
-        """
-        return send_from_directory(app.static_folder, 'index.html')
+
+def append_segment(app: Flask, user_id: str, content: str,
+                   interaction: Optional[Dict[str, Any]] = None,
+                   is_merged: bool = False,
+                   merged_from: Optional[List[str]] = None) -> StorySegment:
+    """Append a segment to a user's story in a single transaction.
+
+    Locks the latest segment to derive the next sequence number and inserts
+    the new segment. The optional interaction and the user's activity
+    timestamp are buffered and written later in batches. An interaction
+    whose type is not a short string is recorded as 'unknown', so it
+    cannot fail the batch it is written with.
+
+    Args:
+        app: Flask application instance
+        user_id: The ID of the user whose story to extend
+        content: The generated segment text
+        interaction: Optional interaction data that produced the segment
+        is_merged: Whether the segment merges in another storyline
+        merged_from: Optional IDs of the segments merged into this one
+
+    Returns:
+        StorySegment: The newly created segment
+    """
+    with app.db.session_scope() as session:
+        latest = app.db.get_latest_segment(user_id, session=session, for_update=True)
+        segment = app.db.create_story_segment(
+            user_id=user_id,
+            content=content,
+            sequence_number=(latest.sequence_number + 1) if latest else 0,
+            parent_id=latest.id if latest else None,
+            is_merged=is_merged,
+            merged_from=merged_from,
+            session=session
+        )
     
-    @app.route('/api/health')
-    def health():
-        """Health check endpoint.
+    if interaction:
+        interaction_type = interaction.get('type')
+        if not (isinstance(interaction_type, str)
+                and 0 < len(interaction_type) <= MAX_INTERACTION_TYPE_LENGTH):
+            interaction_type = 'unknown'
+        app.interactions.record(user_id, interaction_type, interaction)
+    app.activity.record(user_id)
+    return segment
 
-        Returns:
-            Response: JSON with status and current timestamp.
-        """
-        return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
+
+api = Blueprint('api', __name__)
+
+
+@api.route('/')
+def index():
+    """Serve the main page.
+
+    Returns:
+        Response: The index.html file from the static folder.
+    """
+    return send_from_directory(current_app.static_folder, 'index.html')
+
+
+@api.route('/api/health')
+def health():
+    """Health check endpoint.
+
+    GET and HEAD requests are answered by the HealthShortcut middleware
+    before reaching this view.
+
+    Returns:
+        Response: JSON with the service status.
+    """
+    return jsonify({'status': 'healthy'})
+
+
+@api.route('/api/session', methods=['POST'])
+def create_session():
+    """Create a new user session.
+
+    Creates a unique session ID, registers a new user in the database,
+    and initializes a story generator for the session.
+
+    Returns:
+        Response: JSON with session_id and user_id.
+    """
+    session_id = new_session_id()
+    user = current_app.db.create_user(session_id)
     
-    @app.route('/api/session', methods=['POST'])
-    def create_session():
-        """Create a new user session.
+    # Create a story generator for this session
+    save_generator(current_app, session_id, StoryGenerator())
+    
+    return jsonify({
+        'session_id': session_id,
+        'user_id': user.id
+    })
 
-        Creates a unique session ID, registers a new user in the database,
-        and initializes a story generator for the session.
 
-        Returns:
-            Response: JSON with session_id and user_id.
-        """
-        session_id = str(uuid.uuid4())
-        user = app.db.create_user(session_id)
-        
-        # Create a story generator for this session
-        app.generators[session_id] = StoryGenerator()
-        
-        return jsonify({
-            'session_id': session_id,
-            'user_id': user.id
-        })
+@api.route('/api/session/<session_id>')
+def get_session(session_id: str):
+    """Get session information.
+
+    Args:
+        session_id: The unique session identifier.
+
+    Returns:
+        Response: JSON with user data and story context, or 404 error
+            if session not found.
+    """
+    user = get_user(current_app, session_id)
+    if not user:
+        return jsonify({'error': 'Session not found'}), 404
+    
+    generator = get_generator(current_app, session_id)
+    context = cached_context(current_app, session_id, generator)
     
-    @app.route('/api/session/<session_id>')
-    def get_session(session_id: str):
-        """Get session information.
+    return jsonify({
+        'user': user.to_dict(),
+        'context': context
+    })
 
-        Args:
-            session_id: The unique session identifier.
 
-        Returns:
-            Response: JSON with user data and story context, or 404 error
-                if session not found.
-        """
-        user = app.db.get_user_by_session(session_id)
-        if not user:
-            return jsonify({'error': 'Session not found'}), 404
-        
-        generator = app.generators.get(session_id)
-        context = generator.get_context_summary() if generator else None
-        
-        return jsonify({
-            'user': user.to_dict(),
-            'context': context
-        })
+@api.route('/api/story/start', methods=['POST'])
+def start_story():
+    """Start a new story.
+
+    Expects JSON body with session_id. Resets the story generator
+    and creates an opening segment.
+
+    Returns:
+        Response: JSON with the new segment and context, or error
+            if session is invalid.
+    """
+    data = request.get_json() or {}
+    session_id = data.get('session_id')
+    
+    if not session_id:
+        return jsonify({'error': 'Session ID required'}), 400
+    
+    user = get_user(current_app, session_id)
+    if not user:
+        return jsonify({'error': 'Invalid session'}), 404
+    
+    # Get or create generator
+    generator = get_generator(current_app, session_id, create=True)
+    generator.reset()
     
-    @app.route('/api/story/start', methods=['POST'])
-    def start_story():
-        """Start a new story.
+    # Generate opening
+    opening = generator.generate_opening()
+    save_generator(current_app, session_id, generator)
+    
+    # Save to database
+    segment = current_app.db.create_story_segment(
+        user_id=user.id,
+        content=opening,
+        sequence_number=0
+    )
+    current_app.session_store.invalidate_story(session_id)
+    
+    return jsonify({
+        'segment': segment.to_dict(),
+        'context': cached_context(current_app, session_id, generator)
+    })
 
-        Expects JSON body with session_id. Resets the story generator
-        and creates an opening segment.
 
-        Returns:
-            Response: JSON with the new segment and context, or error
-                if session is invalid.
-        """
-        data = request.get_json() or {}
-        session_id = data.get('session_id')
-        
-        if not session_id:
-            return jsonify({'error': 'Session ID required'}), 400
-        
-        user = app.db.get_user_by_session(session_id)
-        if not user:
-            return jsonify({'error': 'Invalid session'}), 404
-        
-        # Get or create generator
-        if session_id not in app.generators:
-            app.generators[session_id] = StoryGenerator()
-        
-        generator = app.generators[session_id]
-        generator.reset()
-        
-        # Generate opening
-        opening = generator.generate_opening()
-        
-        # Save to database
-        segment = app.db.create_story_segment(
-            user_id=user.id,
-            content=opening,
-            sequence_number=0
-        )
-        
-        return jsonify({
-            'segment': segment.to_dict(),
-            'context': generator.get_context_summary()
-        })
+@api.route('/api/story/continue', methods=['POST'])
+def continue_story():
+    """Continue the story with a new segment.
+
+    Expects JSON body with session_id and optional interaction data.
+    Generates a new story segment based on user interaction.
+
+    Returns:
+        Response: JSON with the new segment and context, or error
+            if session is invalid.
+    """
+    data = request.get_json() or {}
+    session_id = data.get('session_id')
+    interaction = data.get('interaction')
+    
+    if not session_id:
+        return jsonify({'error': 'Session ID required'}), 400
+    
+    user = get_user(current_app, session_id)
+    if not user:
+        return jsonify({'error': 'Invalid session'}), 404
     
-    @app.route('/api/story/continue', methods=['POST'])
-    def continue_story():
-        """Continue the story with a new segment.
+    # Generate new segment
+    generator = get_generator(current_app, session_id, create=True, user=user)
+    content = generator.generate_segment(interaction)
+    save_generator(current_app, session_id, generator)
+    
+    # Record interaction and save segment in one commit
+    segment = append_segment(current_app, user.id, content, interaction)
+    current_app.session_store.invalidate_story(session_id)
+    
+    return jsonify({
+        'segment': segment.to_dict(),
+        'context': cached_context(current_app, session_id, generator)
+    })
 
-        Expects JSON body with session_id and optional interaction data.
-        Generates a new story segment based on user interaction.
 
-        Returns:
-            Response: JSON with the new segment and context, or error
-                if session is invalid.
-        """
-        data = request.get_json() or {}
-        session_id = data.get('session_id')
-        interaction = data.get('interaction')
-        
-        if not session_id:
-            return jsonify({'error': 'Session ID required'}), 400
-        
-        user = app.db.get_user_by_session(session_id)
-        if not user:
-            return jsonify({'error': 'Invalid session'}), 404
-        
-        # Get generator
-        generator = app.generators.get(session_id)
-        if not generator:
-            generator = StoryGenerator()
-            app.generators[session_id] = generator
-        
-        # Record interaction if provided
-        if interaction:
-            app.db.record_interaction(
-                user_id=user.id,
-                interaction_type=interaction.get('type', 'unknown'),
-                data=interaction
-            )
-        
-        # Get latest segment for sequence number
-        latest = app.db.get_latest_segment(user.id)
-        sequence_number = (latest.sequence_number + 1) if latest else 0
-        
-        # Generate new segment
-        content = generator.generate_segment(interaction)
-        
-        # Save to database
-        segment = app.db.create_story_segment(
-            user_id=user.id,
-            content=content,
-            sequence_number=sequence_number,
-            parent_id=latest.id if latest else None
+@api.route('/api/story/<session_id>')
+def get_story(session_id: str):
+    """Get the full story for a session.
+
+    Segments are streamed from the database as they are serialized, so
+    large pages never sit in memory as a list. Pages of at most
+    STORY_CACHE_MAX_LIMIT segments are also cached in the session store
+    until the story or its generator changes, so repeated polling skips
+    the database and serialization entirely.
+
+    Args:
+        session_id: The unique session identifier.
+
+    Returns:
+        Response: JSON with segments list and context, or 404 error
+            if session not found. Supports pagination via query params
+            'limit' (default 50) and 'offset' (default 0).
+    """
+    user = get_user(current_app, session_id)
+    if not user:
+        return jsonify({'error': 'Invalid session'}), 404
+    
+    limit = request.args.get('limit', 50, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    
+    version, body = current_app.session_store.get_story(session_id, limit, offset)
+    if body is not None:
+        return Response(body, mimetype='application/json')
+    
+    generator = get_generator(current_app, session_id)
+    context = cached_context(current_app, session_id, generator)
+    
+    def stream() -> Iterator[bytes]:
+        cached: Optional[List[bytes]] = [] if limit <= STORY_CACHE_MAX_LIMIT else None
+        segments = current_app.db.iter_story_segments(user.id, limit=limit, offset=offset)
+        parts = itertools.chain(
+            [b'{"segments":['],
+            ((b',' if i else b'') + orjson.dumps(s.to_dict()) for i, s in enumerate(segments)),
+            [b'],"context":' + orjson.dumps(context) + b'}']
         )
         
-        # Update user activity
-        app.db.update_user_activity(user.id)
+        for part in parts:
+            if cached is not None:
+                cached.append(part)
+            yield part
         
-        return jsonify({
-            'segment': segment.to_dict(),
-            'context': generator.get_context_summary()
-        })
+        if cached is not None:
+            current_app.session_store.set_story(session_id, version, limit, offset,
+                                                b''.join(cached))
     
-    @app.route('/api/story/<session_id>')
-    def get_story(session_id: str):
-        """Get the full story for a session.
+    return Response(stream_with_context(stream()), mimetype='application/json')
 
-        Args:
-            session_id: The unique session identifier.
 
-        Returns:
-            Response: JSON with segments list and context, or 404 error
-                if session not found. Supports pagination via query params
-                'limit' (default 50) and 'offset' (default 0).
-        """
-        user = app.db.get_user_by_session(session_id)
-        if not user:
-            return jsonify({'error': 'Invalid session'}), 404
-        
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        
-        segments = app.db.get_story_segments(user.id, limit=limit, offset=offset)
-        
-        generator = app.generators.get(session_id)
-        context = generator.get_context_summary() if generator else None
-        
-        return jsonify({
-            'segments': [s.to_dict() for s in segments],
-            'context': context
-        })
-    
-    @app.route('/api/story/mood', methods=['POST'])
-    def set_mood():
-        """Set the story mood.
+@api.route('/api/story/mood', methods=['POST'])
+def set_mood():
+    """Set the story mood.
 
-        Expects JSON body with session_id and mood. Updates the story
-        generator's mood setting.
+    Expects JSON body with session_id and mood. Updates the story
+    generator's mood setting; setting the current mood again leaves the
+    stored generator untouched.
 
-        Returns:
-            Response: JSON with success status and updated context, or
-                error if session/mood is invalid.
-        """
-        data = request.get_json() or {}
-        session_id = data.get('session_id')
-        mood = data.get('mood')
-        
-        if not session_id or not mood:
-            return jsonify({'error': 'Session ID and mood required'}), 400
-        
-        generator = app.generators.get(session_id)
-        if not generator:
-            return jsonify({'error': 'No active story'}), 404
-        
-        if generator.set_mood(mood):
-            return jsonify({'success': True, 'context': generator.get_context_summary()})
-        else:
-            return jsonify({'error': 'Invalid mood'}), 400
+    Returns:
+        Response: JSON with success status and updated context, or
+            error if session/mood is invalid.
+    """
+    data = request.get_json() or {}
+    session_id = data.get('session_id')
+    mood = data.get('mood')
+    
+    if not session_id or not mood:
+        return jsonify({'error': 'Session ID and mood required'}), 400
+    
+    if not isinstance(mood, str) or mood not in MOOD_VALUES:
+        return jsonify({'error': 'Invalid mood'}), 400
+    
+    generator = get_generator(current_app, session_id)
+    if not generator:
+        return jsonify({'error': 'No active story'}), 404
+    
+    context = cached_context(current_app, session_id, generator)
+    if context['mood'] != mood:
+        generator.set_mood(mood)
+        save_generator(current_app, session_id, generator)
+        context = cached_context(current_app, session_id, generator)
     
-    @app.route('/api/story/genre', methods=['POST'])
-    def set_genre():
-        """Set the story genre.
+    return jsonify({'success': True, 'context': context})
 
-        Expects JSON body with session_id and genre. Updates the story
-        generator's genre setting.
 
-        Returns:
-            Response: JSON with success status and updated context, or
-                error if session/genre is invalid.
-        """
-        data = request.get_json() or {}
-        session_id = data.get('session_id')
-        genre = data.get('genre')
-        
-        if not session_id or not genre:
-            return jsonify({'error': 'Session ID and genre required'}), 400
-        
-        generator = app.generators.get(session_id)
-        if not generator:
-            return jsonify({'error': 'No active story'}), 404
-        
-        if generator.set_genre(genre):
-            return jsonify({'success': True, 'context': generator.get_context_summary()})
-        else:
-            return jsonify({'error': 'Invalid genre'}), 400
-    
-    @app.route('/api/users/active')
-    def get_active_users():
-        """Get list of active users for potential merging.
+@api.route('/api/story/genre', methods=['POST'])
+def set_genre():
+    """Set the story genre.
 
-        Returns:
-            Response: JSON with users list and count. Supports optional
-                query param 'minutes' (default 5) to filter by activity
-                window.
-        """
-        minutes = request.args.get('minutes', 5, type=int)
-        users = app.db.get_active_users(minutes=minutes)
-        return jsonify({
-            'users': [u.to_dict() for u in users],
-            'count': len(users)
-        })
+    Expects JSON body with session_id and genre. Updates the story
+    generator's genre setting; setting the current genre again leaves the
+    stored generator untouched.
+
+    Returns:
+        Response: JSON with success status and updated context, or
+            error if session/genre is invalid.
+    """
+    data = request.get_json() or {}
+    session_id = data.get('session_id')
+    genre = data.get('genre')
+    
+    if not session_id or not genre:
+        return jsonify({'error': 'Session ID and genre required'}), 400
+    
+    if not isinstance(genre, str) or genre not in GENRE_VALUES:
+        return jsonify({'error': 'Invalid genre'}), 400
     
-    @app.route('/api/merge/request', methods=['POST'])
-    def request_merge():
-        """Request to merge storylines with another user.
+    generator = get_generator(current_app, session_id)
+    if not generator:
+        return jsonify({'error': 'No active story'}), 404
+    
+    context = cached_context(current_app, session_id, generator)
+    if context['genre'] != genre:
+        generator.set_genre(genre)
+        save_generator(current_app, session_id, generator)
+        context = cached_context(current_app, session_id, generator)
+    
+    return jsonify({'success': True, 'context': context})
 
-        Expects JSON body with session_id and target_session_id. Creates
-        a merge request from the source user to the target user.
 
-        Returns:
-            Response: JSON with merge_request data, or error if sessions
-                are invalid or no story exists to merge.
-        """
-        data = request.get_json() or {}
-        session_id = data.get('session_id')
-        target_session_id = data.get('target_session_id')
-        
-        if not session_id or not target_session_id:
-            return jsonify({'error': 'Both session IDs required'}), 400
-        
-        source_user = app.db.get_user_by_session(session_id)
-        target_user = app.db.get_user_by_session(target_session_id)
-        
-        if not source_user or not target_user:
-            return jsonify({'error': 'Invalid session(s)'}), 404
-        
-        latest = app.db.get_latest_segment(source_user.id)
-        if not latest:
-            return jsonify({'error': 'No story to merge'}), 400
-        
-        merge_request = app.db.create_merge_request(
-            source_user_id=source_user.id,
-            target_user_id=target_user.id,
-            source_segment_id=latest.id
-        )
-        
-        return jsonify({'merge_request': merge_request.to_dict()})
+@api.route('/api/users/active')
+def get_active_users():
+    """Get list of active users for potential merging.
+
+    Returns:
+        Response: JSON with users list and count. Supports optional
+            query param 'minutes' (default 5) to filter by activity
+            window.
+    """
+    minutes = request.args.get('minutes', 5, type=int)
+    users = current_app.db.get_active_users(minutes=minutes)
+    return jsonify({
+        'users': [u.to_dict() for u in users],
+        'count': len(users)
+    })
+
+
+@api.route('/api/merge/request', methods=['POST'])
+def request_merge():
+    """Request to merge storylines with another user.
+
+    Expects JSON body with session_id and target_session_id. Creates
+    a merge request from the source user to the target user.
+
+    Returns:
+        Response: JSON with merge_request data, or error if sessions
+            are invalid or no story exists to merge.
+    """
+    data = request.get_json() or {}
+    session_id = data.get('session_id')
+    target_session_id = data.get('target_session_id')
+    
+    if not session_id or not target_session_id:
+        return jsonify({'error': 'Both session IDs required'}), 400
+    
+    source_user = get_user(current_app, session_id)
+    target_user = get_user(current_app, target_session_id)
     
-    @app.route('/api/merge/pending/<session_id>')
-    def get_pending_merges(session_id: str):
-        """Get pending merge requests for a user.
+    if not source_user or not target_user:
+        return jsonify({'error': 'Invalid session(s)'}), 404
+    
+    latest = current_app.db.get_latest_segment(source_user.id)
+    if not latest:
+        return jsonify({'error': 'No story to merge'}), 400
+    
+    merge_request = current_app.db.create_merge_request(
+        source_user_id=source_user.id,
+        target_user_id=target_user.id,
+        source_segment_id=latest.id
+    )
+    
+    return jsonify({'merge_request': merge_request.to_dict()})
 
-        Args:
-            session_id: The unique session identifier.
 
-        Returns:
-            Response: JSON with list of pending merge requests, or 404
-                error if session not found.
-        """
-        user = app.db.get_user_by_session(session_id)
-        if not user:
-            return jsonify({'error': 'Invalid session'}), 404
-        
-        requests = app.db.get_pending_merge_requests(user.id)
-        return jsonify({
-            'requests': [r.to_dict() for r in requests]
-        })
+@api.route('/api/merge/pending/<session_id>')
+def get_pending_merges(session_id: str):
+    """Get pending merge requests for a user.
+
+    Args:
+        session_id: The unique session identifier.
+
+    Returns:
+        Response: JSON with list of pending merge requests, or 404
+            error if session not found.
+    """
+    user = get_user(current_app, session_id)
+    if not user:
+        return jsonify({'error': 'Invalid session'}), 404
     
-    @app.route('/api/merge/accept', methods=['POST'])
-    def accept_merge():
-        """Accept a merge request and combine storylines.
+    requests = current_app.db.get_pending_merge_requests(user.id)
+    return jsonify({
+        'requests': [r.to_dict() for r in requests]
+    })
 
-        Expects JSON body with session_id and request_id. Resolves the
-        merge request and generates a combined story segment.
 
-        Returns:
-            Response: JSON with the merged segment and context, or error
-                if session/request is invalid.
-        """
-        data = request.get_json() or {}
-        session_id = data.get('session_id')
-        request_id = data.get('request_id')
-        
-        if not session_id or not request_id:
-            return jsonify({'error': 'Session ID and request ID required'}), 400
-        
-        user = app.db.get_user_by_session(session_id)
-        if not user:
-            return jsonify({'error': 'Invalid session'}), 404
-        
-        # Resolve the merge request
-        merge_request = app.db.resolve_merge_request(request_id, accepted=True)
-        if not merge_request:
-            return jsonify({'error': 'Merge request not found'}), 404
-        
-        # Get the source segment
-        source_segment = app.db.get_segment_by_id(merge_request.source_segment_id)
-        if not source_segment:
-            return jsonify({'error': 'Source segment not found'}), 404
-        
-        # Generate merged content
-        generator = app.generators.get(session_id)
-        if not generator:
-            generator = StoryGenerator()
-            app.generators[session_id] = generator
-        
-        merged_content = generator.merge_storylines([source_segment.content])
-        
-        # Get latest segment for sequence number
-        latest = app.db.get_latest_segment(user.id)
-        sequence_number = (latest.sequence_number + 1) if latest else 0
-        
-        # Create merged segment
-        segment = app.db.create_story_segment(
-            user_id=user.id,
-            content=merged_content,
-            sequence_number=sequence_number,
-            parent_id=latest.id if latest else None,
-            is_merged=True,
-            merged_from=[source_segment.id]
-        )
-        
-        return jsonify({
-            'segment': segment.to_dict(),
-            'context': generator.get_context_summary()
-        })
+@api.route('/api/merge/accept', methods=['POST'])
+def accept_merge():
+    """Accept a merge request and combine storylines.
+
+    Expects JSON body with session_id and request_id. Resolves the
+    merge request and generates a combined story segment.
+
+    Returns:
+        Response: JSON with the merged segment and context, or error
+            if session/request is invalid.
+    """
+    data = request.get_json() or {}
+    session_id = data.get('session_id')
+    request_id = data.get('request_id')
+    
+    if not session_id or not request_id:
+        return jsonify({'error': 'Session ID and request ID required'}), 400
+    
+    user = get_user(current_app, session_id)
+    if not user:
+        return jsonify({'error': 'Invalid session'}), 404
+    
+    # Resolve the merge request
+    merge_request = current_app.db.resolve_merge_request(request_id, accepted=True)
+    if not merge_request:
+        return jsonify({'error': 'Merge request not found'}), 404
+    
+    # Get the source segment
+    source_segment = current_app.db.get_segment_by_id(merge_request.source_segment_id)
+    if not source_segment:
+        return jsonify({'error': 'Source segment not found'}), 404
+    
+    # Generate merged content
+    generator = get_generator(current_app, session_id, create=True, user=user)
+    merged_content = generator.merge_storylines([source_segment.content])
+    save_generator(current_app, session_id, generator)
+    
+    # Save the merged segment in one commit
+    segment = append_segment(current_app, user.id, merged_content,
+                             is_merged=True, merged_from=[source_segment.id])
+    current_app.session_store.invalidate_story(session_id)
     
-    @app.route('/api/interactions/<session_id>')
-    def get_interactions(session_id: str):
-        """Get interaction history for a session.
+    return jsonify({
+        'segment': segment.to_dict(),
+        'context': cached_context(current_app, session_id, generator)
+    })
 
-        Args:
-            session_id: The unique session identifier.
 
-        Returns:
-            Response: JSON with interactions list and counts, or 404
-                error if session not found. Supports optional query
-                param 'limit' (default 10).
-        """
-        user = app.db.get_user_by_session(session_id)
-        if not user:
-            return jsonify({'error': 'Invalid session'}), 404
-        
-        limit = request.args.get('limit', 10, type=int)
-        interactions = app.db.get_recent_interactions(user.id, limit=limit)
-        counts = app.db.get_interaction_counts(user.id)
-        
-        return jsonify({
-            'interactions': [i.to_dict() for i in interactions],
-            'counts': counts
-        })
+@api.route('/api/interactions/<session_id>')
+def get_interactions(session_id: str):
+    """Get interaction history for a session.
+
+    Args:
+        session_id: The unique session identifier.
+
+    Returns:
+        Response: JSON with interactions list and counts, or 404
+            error if session not found. Supports optional query
+            param 'limit' (default 10).
+    """
+    user = get_user(current_app, session_id)
+    if not user:
+        return jsonify({'error': 'Invalid session'}), 404
+    
+    limit = request.args.get('limit', 10, type=int)
+    # Write queued interactions first so the history is complete
+    current_app.interactions.flush()
+    interactions = current_app.db.get_recent_interactions(user.id, limit=limit)
+    counts = current_app.db.get_interaction_counts(user.id)
+    
+    return jsonify({
+        'interactions': [i.to_dict() for i in interactions],
+        'counts': counts
+    })
 
 
 def register_socket_events(socketio: SocketIO, app: Flask) -> None:
@@ -539,43 +789,25 @@ def register_socket_events(socketio: SocketIO, app: Flask) -> None:
             emit('error', {'message': 'Session ID required'})
             return
         
-        user = app.db.get_user_by_session(session_id)
+        user = get_user(app, session_id)
         if not user:
             emit('error', {'message': 'Invalid session'})
             return
         
-        # Record interaction
-        if interaction:
-            app.db.record_interaction(
-                user_id=user.id,
-                interaction_type=interaction.get('type', 'unknown'),
-                data=interaction
-            )
-        
-        # Get generator
-        generator = app.generators.get(session_id)
-        if not generator:
-            generator = StoryGenerator()
-            app.generators[session_id] = generator
-        
         # Generate new segment
-        latest = app.db.get_latest_segment(user.id)
-        sequence_number = (latest.sequence_number + 1) if latest else 0
-        
+        generator = get_generator(app, session_id, create=True, user=user)
         content = generator.generate_segment(interaction)
+        save_generator(app, session_id, generator)
         
-        segment = app.db.create_story_segment(
-            user_id=user.id,
-            content=content,
-            sequence_number=sequence_number,
-            parent_id=latest.id if latest else None
-        )
+        # Record interaction and save segment in one commit
+        segment = append_segment(app, user.id, content, interaction)
+        app.session_store.invalidate_story(session_id)
         
-        # Emit to room
-        emit('story_update', {
+        # Hand the update to the emit worker instead of writing it here
+        app.emit_queue.put(('story_update', {
             'segment': segment.to_dict(),
-            'context': generator.get_context_summary()
-        }, room=session_id)
+            'context': cached_context(app, session_id, generator)
+        }, session_id))
     
     @socketio.on('merge_notification')
     def handle_merge_notification(data):
@@ -590,6 +822,44 @@ def register_socket_events(socketio: SocketIO, app: Flask) -> None:
             emit('merge_request', data, room=target_session_id)
 
 
-# Create default app instance
-app = create_app()
-socketio = create_socketio(app)
+@functools.lru_cache(maxsize=1)
+def _default_app() -> Tuple[Flask, SocketIO]:
+    """Build the process-wide default application once, on first use.
+
+    Returns:
+        Tuple[Flask, SocketIO]: The default app and its SocketIO instance
+    """
+    app = create_app()
+    return app, create_socketio(app)
+
+
+def application_factory() -> Flask:
+    """Return the default application for WSGI servers.
+
+    Example:
+        gunicorn -k eventlet -w 1 'src.backend.server:application_factory()'
+
+    Returns:
+        Flask: The process-wide default application
+    """
+    return _default_app()[0]
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the legacy module-level ``app`` and ``socketio`` lazily.
+
+    Importing this module no longer creates an application (and its
+    database tables); the default instance is only built when one of
+    these names is first accessed.
+
+    Args:
+        name: The attribute being looked up
+
+    Returns:
+        Any: The default Flask app or SocketIO instance
+    """
+    if name == 'app':
+        return _default_app()[0]
+    if name == 'socketio':
+        return _default_app()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,513 @@
+"""
+Infinite Story Web - Session Store
+
+This module provides storage for per-session state: the story generator
+driving each session, its cached context summary, cached story responses
+and a read-through cache of the session's user record.
+State lives in process memory by default, or in Redis when a REDIS_URL is
+configured so that several workers can share it.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from .story_generator import StoryGenerator
+
+
+DEFAULT_SESSION_TTL = 1800
+DEFAULT_MAX_SESSIONS = 10000
+CONTEXT_CACHE_TTL = 300
+LOCAL_USER_TTL = 60
+LOCAL_USER_MAXSIZE = 10000
+MAX_STORY_PAGES = 16
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after a fixed time."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries before the least recently
+                used one is evicted.
+            ttl: Seconds an entry stays valid after it was set.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value if it is present and not expired.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            Optional[Any]: The cached value, or None on a miss.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: The cache key.
+            value: The value to cache.
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        """Remove a value if present.
+
+        Args:
+            key: The cache key.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all values."""
+        with self._lock:
+            self._data.clear()
+
+
+class MemorySessionStore:
+    """Keeps session state in the memory of the current process.
+
+    State is kept for at most max_sessions sessions, whether or not they
+    have a generator. Storing state for a session beyond that evicts the
+    least recently used session along with everything cached for it; its
+    generator can be rebuilt from the stored story.
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS):
+        """Initialize an empty in-memory store.
+
+        Args:
+            max_sessions: Maximum number of sessions to keep state for.
+        """
+        self.max_sessions = max_sessions
+        # Every session with any state, least recently used first
+        self._sessions: 'OrderedDict[str, None]' = OrderedDict()
+        self._generators: Dict[str, StoryGenerator] = {}
+        self._contexts: Dict[str, Dict[str, Any]] = {}
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._story_versions: Dict[str, int] = {}
+        self._stories: Dict[str, Dict[Tuple[int, int], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get_generator(self, session_id: str) -> Optional[StoryGenerator]:
+        """Get the story generator for a session.
+
+        Args:
+            session_id: The unique session identifier.
+
+        Returns:
+            Optional[StoryGenerator]: The stored generator, or None if the
+                session has no generator yet.
+        """
+        with self._lock:
+            generator = self._generators.get(session_id)
+            if generator is not None:
+                self._sessions.move_to_end(session_id)
+            return generator
+
+    def save_generator(self, session_id: str, generator: StoryGenerator) -> None:
+        """Store the story generator for a session.
+
+        Also drops the cached context summary and story responses, since
+        saving means the generator state may have changed.
+
+        Args:
+            session_id: The unique session identifier.
+            generator: The generator to store.
+        """
+        with self._lock:
+            self._generators[session_id] = generator
+            self._contexts.pop(session_id, None)
+            self._bump_story_version(session_id)
+
+    def get_context(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get the cached context summary for a session.
+
+        Args:
+            session_id: The unique session identifier.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached summary, or None on a miss.
+        """
+        return self._contexts.get(session_id)
+
+    def set_context(self, session_id: str, context: Dict[str, Any]) -> None:
+        """Cache the context summary for a session.
+
+        Args:
+            session_id: The unique session identifier.
+            context: The summary returned by get_context_summary.
+        """
+        with self._lock:
+            self._contexts[session_id] = context
+            self._touch(session_id)
+
+    def get_user(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get the cached user record for a session.
+
+        Args:
+            session_id: The unique session identifier.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached user dictionary, or None
+                on a cache miss.
+        """
+        with self._lock:
+            user = self._users.get(session_id)
+            if user is not None:
+                self._sessions.move_to_end(session_id)
+            return user
+
+    def set_user(self, session_id: str, user: Dict[str, Any]) -> None:
+        """Cache the user record for a session.
+
+        Args:
+            session_id: The unique session identifier.
+            user: The user dictionary as returned by User.to_dict.
+        """
+        with self._lock:
+            self._users[session_id] = user
+            self._touch(session_id)
+
+    def invalidate_user(self, session_id: str) -> None:
+        """Drop the cached user record for a session.
+
+        Args:
+            session_id: The unique session identifier.
+        """
+        with self._lock:
+            self._users.pop(session_id, None)
+
+    def get_story(self, session_id: str, limit: int,
+                  offset: int) -> Tuple[int, Optional[bytes]]:
+        """Get a cached story response for a session.
+
+        Args:
+            session_id: The unique session identifier.
+            limit: The page size of the cached response.
+            offset: The page offset of the cached response.
+
+        Returns:
+            Tuple[int, Optional[bytes]]: The current story version, and the
+                cached response body if one was stored for that version.
+        """
+        with self._lock:
+            version = self._story_versions.get(session_id, 0)
+            return version, self._stories.get(session_id, {}).get((limit, offset))
+
+    def set_story(self, session_id: str, version: int, limit: int,
+                  offset: int, body: bytes) -> None:
+        """Cache a story response for a session.
+
+        Only pages of the current story version are kept, and at most
+        MAX_STORY_PAGES of them per session; the least recently cached
+        page is dropped first.
+
+        Args:
+            session_id: The unique session identifier.
+            version: The story version returned by get_story before the
+                response was built. A response built from a version that
+                has since been invalidated is not stored.
+            limit: The page size of the response.
+            offset: The page offset of the response.
+            body: The serialized JSON response body.
+        """
+        with self._lock:
+            if version != self._story_versions.get(session_id, 0):
+                return
+            pages = self._stories.setdefault(session_id, {})
+            pages.pop((limit, offset), None)
+            pages[(limit, offset)] = body
+            while len(pages) > MAX_STORY_PAGES:
+                del pages[next(iter(pages))]
+            self._touch(session_id)
+
+    def invalidate_story(self, session_id: str) -> None:
+        """Drop the cached story responses for a session.
+
+        Args:
+            session_id: The unique session identifier.
+        """
+        with self._lock:
+            self._bump_story_version(session_id)
+
+    def _bump_story_version(self, session_id: str) -> None:
+        """Increment the story version of a session. Caller holds the lock.
+
+        The pages cached for the previous version are dropped.
+
+        Args:
+            session_id: The unique session identifier.
+        """
+        self._story_versions[session_id] = self._story_versions.get(session_id, 0) + 1
+        self._stories.pop(session_id, None)
+        self._touch(session_id)
+
+    def _touch(self, session_id: str) -> None:
+        """Mark a session as most recently used. Caller holds the lock.
+
+        Evicts the least recently used sessions while more than
+        max_sessions have state.
+
+        Args:
+            session_id: The unique session identifier.
+        """
+        self._sessions[session_id] = None
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            self._forget(evicted)
+
+    def _forget(self, session_id: str) -> None:
+        """Drop all state of an evicted session. Caller holds the lock.
+
+        Args:
+            session_id: The unique session identifier.
+        """
+        self._generators.pop(session_id, None)
+        self._contexts.pop(session_id, None)
+        self._users.pop(session_id, None)
+        self._story_versions.pop(session_id, None)
+        self._stories.pop(session_id, None)
+
+    def clear(self) -> None:
+        """Remove all stored session state."""
+        with self._lock:
+            self._sessions.clear()
+            self._generators.clear()
+            self._contexts.clear()
+            self._users.clear()
+            self._story_versions.clear()
+            self._stories.clear()
+
+
+class RedisSessionStore:
+    """Keeps session state in Redis with a sliding expiry per key.
+
+    Generators are stored as JSON under ``gen:{session_id}``, context
+    summaries under ``ctx:{session_id}`` and user records under
+    ``user:{session_id}``. Story responses are stored under
+    ``story:{session_id}:{version}:{limit}:{offset}``, where the version
+    counter ``story:{session_id}:version`` is incremented on every write so
+    stale responses are simply never read again. Every write refreshes the
+    TTL, so abandoned sessions expire on their own.
+
+    User records are additionally kept in a per-process TTLCache. An
+    invalidation only clears the local copy of the current process, so
+    other workers may serve a user record up to LOCAL_USER_TTL seconds old.
+    """
+
+    def __init__(self, client, ttl: int = DEFAULT_SESSION_TTL):
+        """Initialize the store.
+
+        Args:
+            client: A redis.Redis client instance.
+            ttl: Expiry in seconds applied on every write.
+        """
+        self.client = client
+        self.ttl = ttl
+        self._local_users = TTLCache(LOCAL_USER_MAXSIZE, LOCAL_USER_TTL)
+
+    @classmethod
+    def from_url(cls, url: str, ttl: int = DEFAULT_SESSION_TTL) -> 'RedisSessionStore':
+        """Create a store connected to the given Redis URL.
+
+        Args:
+            url: Redis connection URL, e.g. redis://localhost:6379/0.
+            ttl: Expiry in seconds applied on every write.
+
+        Returns:
+            RedisSessionStore: A store backed by a new Redis client.
+        """
+        import redis
+
+        return cls(redis.Redis.from_url(url), ttl=ttl)
+
+    def get_generator(self, session_id: str) -> Optional[StoryGenerator]:
+        """Get the story generator for a session.
+
+        Args:
+            session_id: The unique session identifier.
+
+        Returns:
+            Optional[StoryGenerator]: A generator restored from the stored
+                state, or None if the key is missing or expired.
+        """
+        raw = self.client.get(f'gen:{session_id}')
+        if raw is None:
+            return None
+        return StoryGenerator.from_state(json.loads(raw))
+
+    def save_generator(self, session_id: str, generator: StoryGenerator) -> None:
+        """Store the story generator for a session.
+
+        Also drops the cached context summary and story responses, since
+        saving means the generator state may have changed.
+
+        Args:
+            session_id: The unique session identifier.
+            generator: The generator whose state to store.
+        """
+        pipe = self.client.pipeline()
+        pipe.setex(f'gen:{session_id}', self.ttl, json.dumps(generator.get_state()))
+        pipe.delete(f'ctx:{session_id}')
+        pipe.incr(f'story:{session_id}:version')
+        pipe.expire(f'story:{session_id}:version', self.ttl)
+        pipe.execute()
+
+    def get_context(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get the cached context summary for a session.
+
+        Args:
+            session_id: The unique session identifier.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached summary, or None on a miss.
+        """
+        raw = self.client.get(f'ctx:{session_id}')
+        return json.loads(raw) if raw is not None else None
+
+    def set_context(self, session_id: str, context: Dict[str, Any]) -> None:
+        """Cache the context summary for a session.
+
+        Args:
+            session_id: The unique session identifier.
+            context: The summary returned by get_context_summary.
+        """
+        self.client.setex(f'ctx:{session_id}', CONTEXT_CACHE_TTL, json.dumps(context))
+
+    def get_user(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get the cached user record for a session.
+
+        Args:
+            session_id: The unique session identifier.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached user dictionary, or None
+                on a cache miss.
+        """
+        user = self._local_users.get(session_id)
+        if user is not None:
+            return user
+        
+        raw = self.client.get(f'user:{session_id}')
+        if raw is None:
+            return None
+        user = json.loads(raw)
+        self._local_users.set(session_id, user)
+        return user
+
+    def set_user(self, session_id: str, user: Dict[str, Any]) -> None:
+        """Cache the user record for a session.
+
+        Args:
+            session_id: The unique session identifier.
+            user: The user dictionary as returned by User.to_dict.
+        """
+        self._local_users.set(session_id, user)
+        self.client.setex(f'user:{session_id}', self.ttl, json.dumps(user))
+
+    def invalidate_user(self, session_id: str) -> None:
+        """Drop the cached user record for a session.
+
+        Args:
+            session_id: The unique session identifier.
+        """
+        self._local_users.pop(session_id)
+        self.client.delete(f'user:{session_id}')
+
+    def get_story(self, session_id: str, limit: int,
+                  offset: int) -> Tuple[int, Optional[bytes]]:
+        """Get a cached story response for a session.
+
+        Args:
+            session_id: The unique session identifier.
+            limit: The page size of the cached response.
+            offset: The page offset of the cached response.
+
+        Returns:
+            Tuple[int, Optional[bytes]]: The current story version, and the
+                cached response body if one was stored for that version.
+        """
+        version = int(self.client.get(f'story:{session_id}:version') or 0)
+        body = self.client.get(f'story:{session_id}:{version}:{limit}:{offset}')
+        return version, body
+
+    def set_story(self, session_id: str, version: int, limit: int,
+                  offset: int, body: bytes) -> None:
+        """Cache a story response for a session.
+
+        Args:
+            session_id: The unique session identifier.
+            version: The story version returned by get_story before the
+                response was built.
+            limit: The page size of the response.
+            offset: The page offset of the response.
+            body: The serialized JSON response body.
+        """
+        self.client.setex(f'story:{session_id}:{version}:{limit}:{offset}',
+                          CONTEXT_CACHE_TTL, body)
+
+    def invalidate_story(self, session_id: str) -> None:
+        """Drop the cached story responses for a session.
+
+        Args:
+            session_id: The unique session identifier.
+        """
+        pipe = self.client.pipeline()
+        pipe.incr(f'story:{session_id}:version')
+        pipe.expire(f'story:{session_id}:version', self.ttl)
+        pipe.execute()
+
+    def clear(self) -> None:
+        """Remove all stored session state.
+
+        Only keys written by this store are deleted.
+        """
+        self._local_users.clear()
+        for pattern in ('gen:*', 'ctx:*', 'user:*', 'story:*'):
+            keys = list(self.client.scan_iter(match=pattern))
+            if keys:
+                self.client.delete(*keys)
+
+
+def create_session_store(redis_url: Optional[str] = None,
+                         ttl: int = DEFAULT_SESSION_TTL,
+                         max_sessions: int = DEFAULT_MAX_SESSIONS):
+    """Create the session store for the given configuration.
+
+    Args:
+        redis_url: Optional Redis URL. When empty, an in-memory store is used.
+        ttl: Expiry in seconds for Redis-backed state.
+        max_sessions: Maximum number of sessions an in-memory store keeps.
+
+    Returns:
+        MemorySessionStore or RedisSessionStore: The configured store.
+    """
+    if redis_url:
+        return RedisSessionStore.from_url(redis_url, ttl=ttl)
+    return MemorySessionStore(max_sessions=max_sessions)
@@ -6,7 +6,8 @@ procedurally evolving narratives based on user interactions.
 """
 
 import random
-from typing import Dict, List, Optional, Any
+import sys
+from typing import Dict, List, Optional, Any, Sequence, Set, TypeVar
 from dataclasses import dataclass
 from enum import Enum
 
@@ -32,9 +33,45 @@ class Genre(Enum):
     MYSTERY = "mystery"
 
 
+# Valid enum values, for checking user input without constructing enums
+MOOD_VALUES = frozenset(m.value for m in Mood)
+GENRE_VALUES = frozenset(g.value for g in Genre)
+
+# Interaction types the generator reacts to. Incoming types are mapped to
+# these canonical objects, so the dispatch compares by identity; unknown
+# types are never interned.
+SCROLL = sys.intern('scroll')
+CLICK = sys.intern('click')
+KEYPRESS = sys.intern('keypress')
+_INTERACTION_TYPES = {t: t for t in (SCROLL, CLICK, KEYPRESS)}
+
+# generate_segment takes its four yes/no decisions from one 64-bit draw,
+# split into 16-bit fields compared against these precomputed thresholds
+_GATE_MASK = 0xFFFF
+_TRANSITION_GATE = int(0.3 * 65536)
+_TENSION_GATE = int(0.5 * 65536)
+_LOCATION_GATE = int(0.6 * 65536)
+_NEW_CHARACTER_GATE = int(0.7 * 65536)
+
+T = TypeVar('T')
+
+# Random stream shared by generators created without a seed or restored
+# from state. It is separate from the random module, so random.seed() does
+# not make them reproducible; seeded generators own a private stream
+_SHARED_RNG = random.Random()
+
+
 @dataclass
 class StoryContext:
-    """Context for story generation."""
+    """Context for story generation.
+
+    Instances are slotted, without a per-instance __dict__. The slots are
+    declared by hand because dataclass(slots=True) needs Python 3.10.
+    """
+    __slots__ = ('current_mood', 'genre', 'characters', 'locations', 'themes',
+                 'tension_level', 'story_length', 'recent_events',
+                 'character_set', 'location_set')
+
     current_mood: Mood
     genre: Genre
     characters: List[str]
@@ -44,160 +81,209 @@ class StoryContext:
     story_length: int
     recent_events: List[str]
 
+    def __post_init__(self) -> None:
+        """Build the companion sets from the initial lists.
+
+        The sets allow constant-time membership checks and summaries. They
+        are not dataclass fields, so they stay out of repr and equality.
+        """
+        self.character_set: Set[str] = set(self.characters)
+        self.location_set: Set[str] = set(self.locations)
+
 
 class StoryGenerator:
     """Procedural story generation engine."""
 
     # Story building blocks
     OPENINGS = {
-        Genre.FANTASY: [
+        Genre.FANTASY: (
             "In a realm where magic flows like rivers,",
             "Beyond the mountains of the Eternal Dawn,",
             "The ancient prophecy spoke of this moment:",
             "In the kingdom of forgotten dreams,",
             "Where dragons once soared and wizards walked,",
-        ],
-        Genre.SCIFI: [
+        ),
+        Genre.SCIFI: (
             "The starship hummed with quiet energy as",
             "Across the void of space, a signal emerged:",
             "In the year 3047, humanity discovered",
             "The android's circuits flickered as",
             "On the colony ship Eternal Hope,",
-        ],
-        Genre.HORROR: [
+        ),
+        Genre.HORROR: (
             "The shadows seemed to breathe as",
             "Something ancient stirred beneath the surface:",
             "The night grew darker than it should have,",
             "Fear crept in like cold fingers,",
             "What lurked in the darkness was",
-        ],
-        Genre.ROMANCE: [
+        ),
+        Genre.ROMANCE: (
             "Their eyes met across the crowded room,",
             "Love, they say, arrives unexpectedly:",
             "The heart knows what the mind denies,",
             "In that moment, everything changed between them:",
             "Some connections transcend explanation,",
-        ],
-        Genre.ADVENTURE: [
+        ),
+        Genre.ADVENTURE: (
             "The journey ahead would test their limits,",
             "Adventure called from beyond the horizon,",
             "With courage in their heart, they stepped forward:",
             "The map revealed a path unknown,",
             "Every great story begins with a single step,",
-        ],
-        Genre.MYSTERY: [
+        ),
+        Genre.MYSTERY: (
             "The clues didn't add up, but then",
             "Something was terribly wrong here,",
             "The detective noticed what others missed:",
             "Secrets have a way of revealing themselves,",
             "The truth was hidden in plain sight,",
-        ],
+        ),
     }
 
-    CHARACTERS = [
+    CHARACTERS = (
         "the wanderer", "an ancient guardian", "a lost child",
         "the mysterious stranger", "a forgotten hero", "the wise elder",
         "a curious inventor", "the silent observer", "a fierce warrior",
         "the healer", "a cunning thief", "the dreamer",
         "a brave captain", "the oracle", "a rebellious spirit",
-    ]
+    )
 
-    LOCATIONS = [
+    LOCATIONS = (
         "the crystalline caves", "an abandoned city", "the floating islands",
         "the endless forest", "a hidden sanctuary", "the storm-torn sea",
         "the ancient library", "a forgotten temple", "the mirror dimension",
         "the twilight valley", "a mechanical heart", "the dream realm",
-    ]
+    )
 
     ACTIONS = {
-        Mood.MYSTERIOUS: [
+        Mood.MYSTERIOUS: (
             "discovered a hidden truth that changed everything",
             "encountered something that defied explanation",
             "followed whispers that led to ancient secrets",
             "uncovered a mystery spanning centuries",
             "realized nothing was as it seemed",
-        ],
-        Mood.ADVENTUROUS: [
+        ),
+        Mood.ADVENTUROUS: (
             "embarked on a perilous journey",
             "faced dangers that would break lesser souls",
             "discovered uncharted territories",
             "conquered impossible challenges",
             "found strength they never knew existed",
-        ],
-        Mood.DARK: [
+        ),
+        Mood.DARK: (
             "confronted the darkness within",
             "witnessed horrors that haunted their dreams",
             "made a sacrifice that cost everything",
             "faced the abyss and it stared back",
             "lost something precious to the shadows",
-        ],
-        Mood.WHIMSICAL: [
+        ),
+        Mood.WHIMSICAL: (
             "stumbled upon something wonderfully absurd",
             "found magic in the most unexpected place",
             "danced with creatures of pure imagination",
             "discovered that nonsense held the answers",
             "laughed in the face of impossibility",
-        ],
-        Mood.ROMANTIC: [
+        ),
+        Mood.ROMANTIC: (
             "felt their heart skip in unexpected ways",
             "discovered love blooming in darkness",
             "risked everything for a moment together",
             "found connection transcending all barriers",
             "realized love was worth any sacrifice",
-        ],
-        Mood.SUSPENSEFUL: [
+        ),
+        Mood.SUSPENSEFUL: (
             "felt time slowing as danger approached",
             "held their breath as fate hung in balance",
             "watched helplessly as events unfolded",
             "faced a choice that would change everything",
             "sensed something terrible was about to happen",
-        ],
-        Mood.PHILOSOPHICAL: [
+        ),
+        Mood.PHILOSOPHICAL: (
             "questioned the nature of their reality",
             "pondered the meaning of their existence",
             "discovered truth was more complex than imagined",
             "realized wisdom came from unexpected sources",
             "understood that some questions have no answers",
-        ],
+        ),
     }
 
-    TRANSITIONS = [
+    TRANSITIONS = (
         "Meanwhile,", "As time passed,", "Without warning,",
         "In the silence that followed,", "Against all odds,",
         "When hope seemed lost,", "At the edge of reason,",
         "Through the mist of uncertainty,", "In that pivotal moment,",
         "As fate would have it,", "Beyond the veil of reality,",
-    ]
+    )
 
     TENSION_MODIFIERS = {
-        'low': [
+        'low': (
             "A sense of calm settled over",
             "Peace, however brief, brought clarity to",
             "In the quiet moments,",
-        ],
-        'medium': [
+        ),
+        'medium': (
             "Uncertainty hung in the air as",
             "The stakes grew higher when",
             "A turning point approached as",
-        ],
-        'high': [
+        ),
+        'high': (
             "Heart pounding, they realized",
             "There was no turning back now as",
             "Everything converged in this moment:",
-        ],
+        ),
+    }
+
+    MERGE_TRANSITIONS = (
+        "As realities collided,",
+        "In a twist of fate,",
+        "The timelines merged when",
+        "Suddenly, another story intersected:",
+        "From a parallel path came",
+    )
+
+    _MOODS = tuple(Mood)
+    _GENRES = tuple(Genre)
+    _MOOD_BY_VALUE = {m.value: m for m in Mood}
+    _GENRE_BY_VALUE = {g.value: g for g in Genre}
+
+    # Mood selected by each mood-changing key
+    _KEYPRESS_MOOD = {
+        'm': Mood.MYSTERIOUS,
+        'a': Mood.ADVENTUROUS,
+        'd': Mood.DARK,
+        'w': Mood.WHIMSICAL,
+        'r': Mood.ROMANTIC,
+        's': Mood.SUSPENSEFUL,
+        'p': Mood.PHILOSOPHICAL,
     }
 
     def __init__(self, seed: Optional[int] = None):
         """Initialize the story generator.
         
         Args:
-            seed: Optional random seed for reproducibility
+            seed: Optional random seed for reproducibility. A seeded
+                generator draws from its own random stream. Without a seed,
+                it draws from a stream shared by all unseeded generators.
+                Neither uses the random module, so random.seed() has no
+                effect on them.
         """
-        if seed is not None:
-            random.seed(seed)
-        
+        self._rng = _SHARED_RNG if seed is None else random.Random(seed)
         self.context = self._create_initial_context()
 
+    def _pick(self, values: Sequence[T]) -> T:
+        """Pick a uniformly random element with a single random() draw.
+
+        Cheaper than random.choice, which may draw several times to avoid
+        modulo bias; the bias of scaling one float is negligible here.
+
+        Args:
+            values: A non-empty sequence to pick from.
+
+        Returns:
+            T: The chosen element.
+        """
+        return values[int(self._rng.random() * len(values))]
+
     def _create_initial_context(self) -> StoryContext:
         """Create initial story context.
 
@@ -205,11 +291,12 @@ class StoryGenerator:
             StoryContext: A new story context with randomized initial values
                 including mood, genre, a starting character and location.
         """
+        pick = self._pick
         return StoryContext(
-            current_mood=random.choice(list(Mood)),
-            genre=random.choice(list(Genre)),
-            characters=[random.choice(self.CHARACTERS)],
-            locations=[random.choice(self.LOCATIONS)],
+            current_mood=pick(self._MOODS),
+            genre=pick(self._GENRES),
+            characters=[pick(self.CHARACTERS)],
+            locations=[pick(self.LOCATIONS)],
             themes=[],
             tension_level=0.3,
             story_length=0,
@@ -225,16 +312,22 @@ class StoryGenerator:
         Returns:
             str: The opening segment of the story.
         """
-        opening = random.choice(self.OPENINGS[self.context.genre])
-        character = random.choice(self.CHARACTERS)
-        location = random.choice(self.LOCATIONS)
+        ctx = self.context
+        pick = self._pick
         
-        self.context.characters.append(character)
-        self.context.locations.append(location)
+        opening = pick(self.OPENINGS[ctx.genre])
+        character = pick(self.CHARACTERS)
+        location = pick(self.LOCATIONS)
+        
+        ctx.characters.append(character)
+        ctx.character_set.add(character)
+        ctx.locations.append(location)
+        ctx.location_set.add(location)
         
         segment = f"{opening} {character} arrived at {location}."
-        self.context.story_length += len(segment.split())
-        self.context.recent_events.append("story_opening")
+        # Templates are single-spaced, so counting separators counts words
+        ctx.story_length += segment.count(' ') + 1
+        ctx.recent_events.append("story_opening")
         
         return segment
 
@@ -258,44 +351,52 @@ class StoryGenerator:
         if interaction_data:
             self._apply_interaction_influence(interaction_data)
         
+        # Local bindings for the lookups repeated below
+        ctx = self.context
+        pick = self._pick
+        gates = self._rng.getrandbits(64)
+        
         # Build the segment
         parts = []
+        append = parts.append
         
         # Add transition
-        if random.random() > 0.3:
-            parts.append(random.choice(self.TRANSITIONS))
+        if gates & _GATE_MASK > _TRANSITION_GATE:
+            append(pick(self.TRANSITIONS))
         
         # Add tension modifier based on current tension level
-        if random.random() > 0.5:
-            if self.context.tension_level < 0.33:
-                parts.append(random.choice(self.TENSION_MODIFIERS['low']))
-            elif self.context.tension_level < 0.66:
-                parts.append(random.choice(self.TENSION_MODIFIERS['medium']))
+        if (gates >> 16) & _GATE_MASK > _TENSION_GATE:
+            if ctx.tension_level < 0.33:
+                append(pick(self.TENSION_MODIFIERS['low']))
+            elif ctx.tension_level < 0.66:
+                append(pick(self.TENSION_MODIFIERS['medium']))
             else:
-                parts.append(random.choice(self.TENSION_MODIFIERS['high']))
+                append(pick(self.TENSION_MODIFIERS['high']))
         
         # Pick a character and action
-        character = random.choice(self.context.characters) if self.context.characters else random.choice(self.CHARACTERS)
-        action = random.choice(self.ACTIONS[self.context.current_mood])
+        characters = ctx.characters
+        character = pick(characters) if characters else pick(self.CHARACTERS)
+        action = pick(self.ACTIONS[ctx.current_mood])
         
         # Sometimes add location context
-        if random.random() > 0.6:
-            location = random.choice(self.context.locations) if self.context.locations else random.choice(self.LOCATIONS)
-            parts.append(f"{character} {action} in {location}.")
+        if (gates >> 32) & _GATE_MASK > _LOCATION_GATE:
+            location = pick(ctx.locations) if ctx.locations else pick(self.LOCATIONS)
+            append(f"{character} {action} in {location}.")
         else:
-            parts.append(f"{character} {action}.")
+            append(f"{character} {action}.")
         
         # Maybe introduce new elements
-        if random.random() > 0.7:
-            new_char = random.choice(self.CHARACTERS)
-            if new_char not in self.context.characters:
-                self.context.characters.append(new_char)
-                parts.append(f"It was then that {new_char} appeared.")
+        if gates >> 48 > _NEW_CHARACTER_GATE:
+            new_char = pick(self.CHARACTERS)
+            if new_char not in ctx.character_set:
+                characters.append(new_char)
+                ctx.character_set.add(new_char)
+                append(f"It was then that {new_char} appeared.")
         
         segment = ' '.join(parts)
         
-        # Update context
-        self.context.story_length += len(segment.split())
+        # Update context; the parts are single-spaced, so count separators
+        ctx.story_length += segment.count(' ') + 1
         self._evolve_context()
         
         return segment
@@ -313,35 +414,30 @@ class StoryGenerator:
                 and type-specific details (e.g., 'amount' for scroll,
                 'key' for keypress).
         """
-        interaction_type = data.get('type', '')
+        interaction_type = data.get('type')
+        if isinstance(interaction_type, str):
+            interaction_type = _INTERACTION_TYPES.get(interaction_type)
         
-        if interaction_type == 'scroll':
+        if interaction_type is SCROLL:
             # Scrolling affects pacing - more scroll = faster story progression
             scroll_amount = data.get('amount', 0)
             if scroll_amount > 100:
                 self.context.tension_level = min(1.0, self.context.tension_level + 0.1)
             
-        elif interaction_type == 'click':
+        elif interaction_type is CLICK:
             # Clicking introduces new elements
-            if random.random() > 0.5:
-                new_location = random.choice(self.LOCATIONS)
-                if new_location not in self.context.locations:
+            if self._rng.random() > 0.5:
+                new_location = self._pick(self.LOCATIONS)
+                if new_location not in self.context.location_set:
                     self.context.locations.append(new_location)
+                    self.context.location_set.add(new_location)
             
-        elif interaction_type == 'keypress':
+        elif interaction_type is KEYPRESS:
             # Keypresses affect mood
             key = data.get('key', '')
-            mood_map = {
-                'm': Mood.MYSTERIOUS,
-                'a': Mood.ADVENTUROUS,
-                'd': Mood.DARK,
-                'w': Mood.WHIMSICAL,
-                'r': Mood.ROMANTIC,
-                's': Mood.SUSPENSEFUL,
-                'p': Mood.PHILOSOPHICAL,
-            }
-            if key.lower() in mood_map:
-                self.context.current_mood = mood_map[key.lower()]
+            mood = self._KEYPRESS_MOOD.get(key.lower())
+            if mood is not None:
+                self.context.current_mood = mood
 
     def _evolve_context(self) -> None:
         """Naturally evolve the story context over time.
@@ -350,17 +446,20 @@ class StoryGenerator:
         narrative evolution. Mood may shift randomly (15% chance), tension
         oscillates within bounds, and genre may rarely change (5% chance).
         """
+        ctx = self.context
+        rand = self._rng.random
+        
         # Mood might shift randomly
-        if random.random() > 0.85:
-            self.context.current_mood = random.choice(list(Mood))
+        if rand() > 0.85:
+            ctx.current_mood = self._pick(self._MOODS)
         
-        # Tension naturally oscillates
-        tension_change = random.uniform(-0.1, 0.15)
-        self.context.tension_level = max(0.0, min(1.0, self.context.tension_level + tension_change))
+        # Tension naturally oscillates by a uniform change in [-0.1, 0.15)
+        tension = ctx.tension_level + rand() * 0.25 - 0.1
+        ctx.tension_level = 0.0 if tension < 0.0 else (1.0 if tension > 1.0 else tension)
         
         # Occasionally shift genre slightly (rare)
-        if random.random() > 0.95:
-            self.context.genre = random.choice(list(Genre))
+        if rand() > 0.95:
+            ctx.genre = self._pick(self._GENRES)
 
     def merge_storylines(self, other_segments: List[str]) -> str:
         """Merge segments from another storyline into the current one.
@@ -382,23 +481,16 @@ class StoryGenerator:
             return self.generate_segment()
         
         # Pick a segment to merge from
-        merge_segment = random.choice(other_segments)
+        merge_segment = self._pick(other_segments)
         
         # Create a merge transition
-        merge_transitions = [
-            "As realities collided,",
-            "In a twist of fate,",
-            "The timelines merged when",
-            "Suddenly, another story intersected:",
-            "From a parallel path came",
-        ]
-        
-        transition = random.choice(merge_transitions)
+        transition = self._pick(self.MERGE_TRANSITIONS)
         
-        # Extract some essence from the other segment
-        words = merge_segment.split()
+        # Extract some essence (at most the first ten words) from the other
+        # segment; a bounded split avoids splitting the whole segment
+        words = merge_segment.split(None, 10)
         if len(words) > 5:
-            essence = ' '.join(words[:min(10, len(words))])
+            essence = ' '.join(words[:10])
         else:
             essence = merge_segment
         
@@ -423,8 +515,8 @@ class StoryGenerator:
         return {
             'mood': self.context.current_mood.value,
             'genre': self.context.genre.value,
-            'characters': list(set(self.context.characters)),
-            'locations': list(set(self.context.locations)),
+            'characters': list(self.context.character_set),
+            'locations': list(self.context.location_set),
             'tension_level': self.context.tension_level,
             'story_length': self.context.story_length,
         }
@@ -441,11 +533,11 @@ class StoryGenerator:
             bool: True if the mood was set successfully, False if the
                 provided mood value is invalid.
         """
-        try:
-            self.context.current_mood = Mood(mood)
-            return True
-        except ValueError:
+        mood_enum = self._MOOD_BY_VALUE.get(mood) if isinstance(mood, str) else None
+        if mood_enum is None:
             return False
+        self.context.current_mood = mood_enum
+        return True
 
     def set_genre(self, genre: str) -> bool:
         """Set the story genre.
@@ -458,17 +550,103 @@ class StoryGenerator:
             bool: True if the genre was set successfully, False if the
                 provided genre value is invalid.
         """
-        try:
-            self.context.genre = Genre(genre)
-            return True
-        except ValueError:
+        genre_enum = self._GENRE_BY_VALUE.get(genre) if isinstance(genre, str) else None
+        if genre_enum is None:
             return False
+        self.context.genre = genre_enum
+        return True
 
-    def reset(self) -> None:
+    def get_state(self) -> Dict[str, Any]:
+        """Export the full generator state as plain JSON-serializable data.
+
+        Unlike get_context_summary, the exported state is lossless and can
+        be passed to from_state to restore an equivalent generator, e.g.
+        after storing it in an external session store.
+
+        Returns:
+            Dict[str, Any]: A dictionary with every StoryContext field, using
+                enum values for mood and genre.
+        """
+        return {
+            'mood': self.context.current_mood.value,
+            'genre': self.context.genre.value,
+            'characters': list(self.context.characters),
+            'locations': list(self.context.locations),
+            'themes': list(self.context.themes),
+            'tension_level': self.context.tension_level,
+            'story_length': self.context.story_length,
+            'recent_events': list(self.context.recent_events),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StoryGenerator':
+        """Create a generator from a state exported by get_state.
+
+        The generator draws from the stream shared by unseeded generators.
+
+        Args:
+            state: Dictionary previously returned by get_state.
+
+        Returns:
+            StoryGenerator: A generator whose context matches the given state.
+        """
+        generator = cls.__new__(cls)
+        generator._rng = _SHARED_RNG
+        generator.context = StoryContext(
+            current_mood=Mood(state['mood']),
+            genre=Genre(state['genre']),
+            characters=list(state['characters']),
+            locations=list(state['locations']),
+            themes=list(state['themes']),
+            tension_level=state['tension_level'],
+            story_length=state['story_length'],
+            recent_events=list(state['recent_events'])
+        )
+        return generator
+
+    @classmethod
+    def from_segments(cls, segments: List[str], story_length: int = 0) -> 'StoryGenerator':
+        """Rebuild a generator for a story whose generator state was lost.
+
+        Mood and genre are chosen afresh, while the characters and locations
+        mentioned in the given segments are carried over so that the story
+        continues with them.
+
+        Args:
+            segments: Text of the most recent story segments, oldest first.
+            story_length: Word count of the whole story so far, which the
+                segments may only be the end of.
+
+        Returns:
+            StoryGenerator: A generator continuing from the given segments.
+        """
+        generator = cls()
+        text = ' '.join(segments)
+        lowered = text.lower()
+        
+        characters = [c for c in cls.CHARACTERS if c in lowered]
+        locations = [loc for loc in cls.LOCATIONS if loc in lowered]
+        if characters:
+            generator.context.characters = characters
+            generator.context.character_set = set(characters)
+        if locations:
+            generator.context.locations = locations
+            generator.context.location_set = set(locations)
+        generator.context.story_length = story_length
+        
+        return generator
+
+    def reset(self, seed: Optional[int] = None) -> None:
         """Reset the story generator to initial state.
 
         Clears all story progress and creates a fresh context with
         new randomized initial values for mood, genre, characters,
         and locations.
+
+        Args:
+            seed: Optional random seed. When given, the generator restarts
+                from the same state as a new ``StoryGenerator(seed)``.
         """
+        if seed is not None:
+            self._rng = random.Random(seed)
         self.context = self._create_initial_context()
@@ -5,24 +5,67 @@ This module provides the database layer for storing story segments,
 user sessions, and collaborative story merges.
 """
 
-from datetime import datetime
-from typing import Optional, List, Dict, Any
-import uuid
-import json
-
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, ForeignKey, Boolean
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterator
+from uuid import uuid4
+
+import orjson
+from sqlalchemy import (create_engine, case, event, func, insert, update,
+                        Column, String, Text, DateTime, Integer, ForeignKey, Boolean, Index)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, raiseload, Session
+from sqlalchemy.pool import StaticPool
 
 
 Base = declarative_base()
 
+_utcnow = datetime.utcnow
+
+
+def _dump_json(value: Any) -> Optional[str]:
+    """Encode a value for a JSON text column.
+
+    Args:
+        value: The value to encode.
+
+    Returns:
+        Optional[str]: The JSON text, or None if the value is empty.
+    """
+    return orjson.dumps(value).decode() if value else None
+
+
+def _load_json(text: Optional[str]) -> Any:
+    """Decode a JSON text column.
+
+    Args:
+        text: The stored JSON text.
+
+    Returns:
+        Any: The decoded value, or None if nothing is stored.
+    """
+    return orjson.loads(text) if text else None
+
+
+def _new_id() -> str:
+    """Generate a primary key.
+
+    uuid4 is looked up when a key is generated, so tests can replace it.
+
+    Returns:
+        str: A random UUID as 32 hex digits, without dashes.
+    """
+    return uuid4().hex
+
 
 class User(Base):
     """Represents a user session in the system."""
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_last_active', 'last_active'),
+    )
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String(32), primary_key=True, default=_new_id)
     session_id = Column(String(64), unique=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_active = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -44,16 +87,36 @@ class User(Base):
             'last_active': self.last_active.isoformat() if self.last_active else None
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'User':
+        """Build a detached user from its dictionary representation.
+
+        Args:
+            data: Dictionary as produced by to_dict, e.g. from a cache.
+
+        Returns:
+            User: A transient User instance carrying the same values.
+        """
+        return cls(
+            id=data['id'],
+            session_id=data['session_id'],
+            created_at=datetime.fromisoformat(data['created_at']) if data.get('created_at') else None,
+            last_active=datetime.fromisoformat(data['last_active']) if data.get('last_active') else None
+        )
+
 
 class StorySegment(Base):
     """Represents a segment of the evolving story."""
     __tablename__ = 'story_segments'
+    __table_args__ = (
+        Index('ix_segments_user_seq', 'user_id', 'sequence_number'),
+    )
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
+    id = Column(String(32), primary_key=True, default=_new_id)
+    user_id = Column(String(32), ForeignKey('users.id'), nullable=False)
     content = Column(Text, nullable=False)
     sequence_number = Column(Integer, nullable=False)
-    parent_id = Column(String(36), ForeignKey('story_segments.id'), nullable=True)
+    parent_id = Column(String(32), ForeignKey('story_segments.id'), nullable=True)
     is_merged = Column(Boolean, default=False)
     merged_from = Column(Text, nullable=True)  # JSON array of segment IDs
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -75,7 +138,7 @@ class StorySegment(Base):
             'sequence_number': self.sequence_number,
             'parent_id': self.parent_id,
             'is_merged': self.is_merged,
-            'merged_from': json.loads(self.merged_from) if self.merged_from else None,
+            'merged_from': _load_json(self.merged_from),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
@@ -83,9 +146,13 @@ class StorySegment(Base):
 class Interaction(Base):
     """Tracks user interactions that influence story generation."""
     __tablename__ = 'interactions'
+    __table_args__ = (
+        Index('ix_interactions_user_type', 'user_id', 'interaction_type'),
+        Index('ix_interactions_user_ts', 'user_id', 'timestamp'),
+    )
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
+    id = Column(String(32), primary_key=True, default=_new_id)
+    user_id = Column(String(32), ForeignKey('users.id'), nullable=False)
     interaction_type = Column(String(50), nullable=False)  # scroll, click, keypress
     data = Column(Text, nullable=True)  # JSON data for interaction details
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -103,7 +170,7 @@ class Interaction(Base):
             'id': self.id,
             'user_id': self.user_id,
             'interaction_type': self.interaction_type,
-            'data': json.loads(self.data) if self.data else None,
+            'data': _load_json(self.data),
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
 
@@ -111,11 +178,14 @@ class Interaction(Base):
 class MergeRequest(Base):
     """Tracks story merge requests between users."""
     __tablename__ = 'merge_requests'
-
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    source_user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
-    target_user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
-    source_segment_id = Column(String(36), ForeignKey('story_segments.id'), nullable=False)
+    __table_args__ = (
+        Index('ix_merge_target_status', 'target_user_id', 'status'),
+    )
+
+    id = Column(String(32), primary_key=True, default=_new_id)
+    source_user_id = Column(String(32), ForeignKey('users.id'), nullable=False)
+    target_user_id = Column(String(32), ForeignKey('users.id'), nullable=False)
+    source_segment_id = Column(String(32), ForeignKey('story_segments.id'), nullable=False)
     status = Column(String(20), default='pending')  # pending, accepted, rejected
     created_at = Column(DateTime, default=datetime.utcnow)
     resolved_at = Column(DateTime, nullable=True)
@@ -138,17 +208,53 @@ class MergeRequest(Base):
         }
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Configure a new SQLite connection for concurrent access.
+
+    WAL journaling lets readers proceed while a single writer commits, and
+    synchronous=NORMAL is safe in WAL mode while syncing far less often.
+
+    Args:
+        dbapi_connection: The raw sqlite3 connection.
+        connection_record: The pool's record for the connection.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
 class DatabaseManager:
     """Manages database connections and operations."""
 
-    def __init__(self, database_url: str = "sqlite:///stories.db"):
+    def __init__(self, database_url: str = "sqlite:///stories.db",
+                 engine_kwargs: Optional[Dict[str, Any]] = None):
         """Initialize the database manager.
         
         Args:
             database_url: SQLAlchemy database URL
+            engine_kwargs: Optional extra create_engine arguments, e.g. pool
+                sizing. Ignored for in-memory SQLite, which always shares
+                a single connection. That connection is not serialized
+                between threads, so in-memory URLs are meant for tests and
+                local runs only.
         """
-        self.engine = create_engine(database_url, echo=False)
-        self.Session = sessionmaker(bind=self.engine)
+        options: Dict[str, Any] = {'echo': False}
+        if database_url in ('sqlite://', 'sqlite:///:memory:'):
+            # Share the one in-memory database with background threads (tests only)
+            options['poolclass'] = StaticPool
+            options['connect_args'] = {'check_same_thread': False}
+        else:
+            options.update(engine_kwargs or {})
+            if database_url.startswith('sqlite'):
+                # Pooled connections are handed between threads
+                options['connect_args'] = {'check_same_thread': False}
+        
+        self.engine = create_engine(database_url, **options)
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', _set_sqlite_pragmas)
+        # Objects stay loaded after commit, so no refresh SELECT is needed
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
         
     def create_tables(self) -> None:
         """Create all database tables.
@@ -174,25 +280,60 @@ class DatabaseManager:
         """
         return self.Session()
 
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """Provide a transactional scope around a series of operations.
+
+        Methods that accept a ``session`` argument can be passed the yielded
+        session so that all of their work is committed once, when the block
+        exits. The transaction is rolled back if the block raises. Objects
+        created or loaded inside the scope remain usable after it closes.
+
+        Yields:
+            Session: The SQLAlchemy session shared by the block.
+        """
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @contextmanager
+    def _use_session(self, session: Optional[Session] = None) -> Iterator[Session]:
+        """Yield the caller's session, or a new scope if none was given.
+
+        Args:
+            session: Optional session from session_scope.
+
+        Yields:
+            Session: The session to run the operation in.
+        """
+        if session is not None:
+            yield session
+        else:
+            with self.session_scope() as scoped:
+                yield scoped
+
     # User operations
-    def create_user(self, session_id: str) -> User:
+    def create_user(self, session_id: str, session: Optional[Session] = None) -> User:
         """Create a new user with the given session ID.
 
         Args:
             session_id: Unique session identifier for the user.
+            session: Optional session from session_scope to run in.
 
         Returns:
             User: The newly created user instance.
         """
-        session = self.get_session()
-        try:
+        with self._use_session(session) as s:
             user = User(session_id=session_id)
-            session.add(user)
-            session.commit()
-            session.refresh(user)
-            return user
-        finally:
-            session.close()
+            s.add(user)
+            s.flush()
+        return user
 
     def get_user_by_session(self, session_id: str) -> Optional[User]:
         """Get a user by their session ID.
@@ -203,11 +344,8 @@ class DatabaseManager:
         Returns:
             Optional[User]: The user if found, None otherwise.
         """
-        session = self.get_session()
-        try:
+        with self.get_session() as session:
             return session.query(User).filter(User.session_id == session_id).first()
-        finally:
-            session.close()
 
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get a user by their ID.
@@ -218,26 +356,39 @@ class DatabaseManager:
         Returns:
             Optional[User]: The user if found, None otherwise.
         """
-        session = self.get_session()
-        try:
+        with self.get_session() as session:
             return session.query(User).filter(User.id == user_id).first()
-        finally:
-            session.close()
 
-    def update_user_activity(self, user_id: str) -> None:
+    def update_user_activity(self, user_id: str, session: Optional[Session] = None) -> None:
         """Update the last active timestamp for a user.
 
         Args:
             user_id: The unique user identifier to update.
+            session: Optional session from session_scope to run in.
         """
-        session = self.get_session()
-        try:
-            user = session.query(User).filter(User.id == user_id).first()
-            if user:
-                user.last_active = datetime.utcnow()
-                session.commit()
-        finally:
-            session.close()
+        with self._use_session(session) as s:
+            s.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(last_active=_utcnow())
+            )
+
+    def update_users_activity(self, timestamps: Dict[str, datetime]) -> None:
+        """Set the last active timestamps of several users in one UPDATE.
+
+        Args:
+            timestamps: Mapping of user IDs to their last active time.
+        """
+        if not timestamps:
+            return
+        
+        with self.session_scope() as s:
+            s.execute(
+                update(User)
+                .where(User.id.in_(list(timestamps)))
+                .values(last_active=case(timestamps, value=User.id))
+                .execution_options(synchronize_session=False)
+            )
 
     def get_active_users(self, minutes: int = 5) -> List[User]:
         """Get users active within the last N minutes.
@@ -247,18 +398,20 @@ class DatabaseManager:
 
         Returns:
             List[User]: List of users who were active within the specified time.
+                Their relationships are not loaded, and accessing one raises.
         """
-        session = self.get_session()
-        try:
-            cutoff = datetime.utcnow() - __import__('datetime').timedelta(minutes=minutes)
-            return session.query(User).filter(User.last_active >= cutoff).all()
-        finally:
-            session.close()
+        with self.get_session() as session:
+            cutoff = _utcnow() - timedelta(minutes=minutes)
+            return session.query(User)\
+                .options(raiseload('*'))\
+                .filter(User.last_active >= cutoff)\
+                .all()
 
     # Story segment operations
     def create_story_segment(self, user_id: str, content: str, 
                             sequence_number: int, parent_id: Optional[str] = None,
-                            is_merged: bool = False, merged_from: Optional[List[str]] = None) -> StorySegment:
+                            is_merged: bool = False, merged_from: Optional[List[str]] = None,
+                            session: Optional[Session] = None) -> StorySegment:
         """Create a new story segment.
 
         Args:
@@ -268,26 +421,39 @@ class DatabaseManager:
             parent_id: Optional ID of the parent segment for branching stories.
             is_merged: Whether this segment is a result of merging. Defaults to False.
             merged_from: Optional list of segment IDs that were merged to create this.
+            session: Optional session from session_scope to run in.
 
         Returns:
             StorySegment: The newly created story segment instance.
         """
-        session = self.get_session()
-        try:
+        with self._use_session(session) as s:
             segment = StorySegment(
                 user_id=user_id,
                 content=content,
                 sequence_number=sequence_number,
                 parent_id=parent_id,
                 is_merged=is_merged,
-                merged_from=json.dumps(merged_from) if merged_from else None
+                merged_from=_dump_json(merged_from)
             )
-            session.add(segment)
-            session.commit()
-            session.refresh(segment)
-            return segment
-        finally:
-            session.close()
+            s.add(segment)
+            s.flush()
+        return segment
+
+    def create_story_segments(self, user_id: str, segments: List[Dict[str, Any]]) -> None:
+        """Insert several story segments for a user in a single transaction.
+
+        Args:
+            user_id: The ID of the user the segments belong to.
+            segments: Segment column values, one dictionary per segment, with
+                at least content and sequence_number. A merged_from list is
+                JSON-encoded here.
+        """
+        mappings = [
+            {**segment, 'user_id': user_id, 'merged_from': _dump_json(segment.get('merged_from'))}
+            for segment in segments
+        ]
+        with self.session_scope() as session:
+            session.bulk_insert_mappings(StorySegment, mappings)
 
     def get_story_segments(self, user_id: str, limit: int = 50, offset: int = 0) -> List[StorySegment]:
         """Get story segments for a user.
@@ -299,36 +465,81 @@ class DatabaseManager:
 
         Returns:
             List[StorySegment]: List of story segments ordered by sequence number.
+                Their relationships are not loaded, and accessing one raises.
         """
-        session = self.get_session()
-        try:
+        with self.get_session() as session:
             return session.query(StorySegment)\
+                .options(raiseload('*'))\
                 .filter(StorySegment.user_id == user_id)\
                 .order_by(StorySegment.sequence_number)\
                 .offset(offset)\
                 .limit(limit)\
                 .all()
-        finally:
-            session.close()
 
-    def get_latest_segment(self, user_id: str) -> Optional[StorySegment]:
+    def iter_story_segments(self, user_id: str, limit: int = 50,
+                            offset: int = 0) -> Iterator[StorySegment]:
+        """Iterate over story segments for a user without loading them all.
+
+        Rows are fetched in batches through a streaming cursor, and the
+        session stays open until the iteration finishes or is closed.
+
+        Args:
+            user_id: The ID of the user whose segments to retrieve.
+            limit: Maximum number of segments to yield. Defaults to 50.
+            offset: Number of segments to skip for pagination. Defaults to 0.
+
+        Yields:
+            StorySegment: Story segments ordered by sequence number.
+        """
+        with self.get_session() as session:
+            query = session.query(StorySegment)\
+                .filter(StorySegment.user_id == user_id)\
+                .order_by(StorySegment.sequence_number)\
+                .offset(offset)\
+                .limit(limit)\
+                .yield_per(100)
+            yield from query
+
+    def get_recent_segments(self, user_id: str, limit: int = 10) -> List[StorySegment]:
+        """Get the most recent story segments for a user.
+
+        Args:
+            user_id: The ID of the user whose segments to retrieve.
+            limit: Maximum number of segments to return. Defaults to 10.
+
+        Returns:
+            List[StorySegment]: The last segments, ordered by sequence number.
+        """
+        with self.get_session() as session:
+            segments = session.query(StorySegment)\
+                .filter(StorySegment.user_id == user_id)\
+                .order_by(StorySegment.sequence_number.desc())\
+                .limit(limit)\
+                .all()
+            return segments[::-1]
+
+    def get_latest_segment(self, user_id: str, session: Optional[Session] = None,
+                           for_update: bool = False) -> Optional[StorySegment]:
         """Get the latest story segment for a user.
 
         Args:
             user_id: The ID of the user whose latest segment to retrieve.
+            session: Optional session from session_scope to run in.
+            for_update: Lock the row until the session's transaction ends
+                (SELECT ... FOR UPDATE), so concurrent appends cannot reuse
+                the same sequence number. Ignored by SQLite.
 
         Returns:
             Optional[StorySegment]: The most recent segment by sequence number,
                 or None if no segments exist.
         """
-        session = self.get_session()
-        try:
-            return session.query(StorySegment)\
+        with self._use_session(session) as s:
+            query = s.query(StorySegment)\
                 .filter(StorySegment.user_id == user_id)\
-                .order_by(StorySegment.sequence_number.desc())\
-                .first()
-        finally:
-            session.close()
+                .order_by(StorySegment.sequence_number.desc())
+            if for_update:
+                query = query.with_for_update()
+            return query.first()
 
     def get_segment_by_id(self, segment_id: str) -> Optional[StorySegment]:
         """Get a story segment by ID.
@@ -339,11 +550,8 @@ class DatabaseManager:
         Returns:
             Optional[StorySegment]: The segment if found, None otherwise.
         """
-        session = self.get_session()
-        try:
+        with self.get_session() as session:
             return session.query(StorySegment).filter(StorySegment.id == segment_id).first()
-        finally:
-            session.close()
 
     def get_full_story(self, user_id: str) -> str:
         """Get the full story text for a user.
@@ -354,35 +562,82 @@ class DatabaseManager:
         Returns:
             str: The concatenated content of all story segments joined by spaces.
         """
-        segments = self.get_story_segments(user_id, limit=1000)
-        return ' '.join(segment.content for segment in segments)
+        with self.get_session() as session:
+            # Only the content column is loaded; no ORM objects are built
+            rows = session.query(StorySegment.content)\
+                .filter(StorySegment.user_id == user_id)\
+                .order_by(StorySegment.sequence_number)\
+                .limit(1000)\
+                .all()
+            return ' '.join(content for content, in rows)
+
+    def count_story_words(self, user_id: str) -> int:
+        """Count the words of a user's whole story without loading it.
+
+        Words are counted as spaces plus one per segment, the same way
+        StoryGenerator counts them while generating.
+
+        Args:
+            user_id: The ID of the user whose story to measure.
+
+        Returns:
+            int: The number of words across all of the user's segments.
+        """
+        content = StorySegment.content
+        words = func.length(content) - func.length(func.replace(content, ' ', '')) + 1
+        with self.get_session() as session:
+            return session.query(func.coalesce(func.sum(words), 0))\
+                .filter(StorySegment.user_id == user_id)\
+                .scalar()
 
     # Interaction operations
     def record_interaction(self, user_id: str, interaction_type: str, 
-                          data: Optional[Dict[str, Any]] = None) -> Interaction:
+                          data: Optional[Dict[str, Any]] = None,
+                          session: Optional[Session] = None) -> Interaction:
         """Record a user interaction.
 
         Args:
             user_id: The ID of the user performing the interaction.
             interaction_type: The type of interaction (e.g., 'scroll', 'click', 'keypress').
             data: Optional dictionary containing additional interaction details.
+            session: Optional session from session_scope to run in.
 
         Returns:
             Interaction: The newly created interaction instance.
         """
-        session = self.get_session()
-        try:
+        with self._use_session(session) as s:
             interaction = Interaction(
                 user_id=user_id,
                 interaction_type=interaction_type,
-                data=json.dumps(data) if data else None
+                data=_dump_json(data)
             )
-            session.add(interaction)
-            session.commit()
-            session.refresh(interaction)
-            return interaction
-        finally:
-            session.close()
+            s.add(interaction)
+            s.flush()
+        return interaction
+
+    def record_interactions(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert many interactions in a single transaction.
+
+        Args:
+            rows: Interaction column values, one dictionary per interaction,
+                with user_id and interaction_type. An optional data value is
+                JSON-encoded here, and a missing timestamp defaults to now.
+        """
+        now = _utcnow()
+        mappings = [
+            {
+                'user_id': row['user_id'],
+                'interaction_type': row['interaction_type'],
+                'data': _dump_json(row.get('data')),
+                'timestamp': row.get('timestamp') or now
+            }
+            for row in rows
+        ]
+        if not mappings:
+            return
+        # One executemany of a Core INSERT, without building ORM objects
+        with self.session_scope() as session:
+            session.execute(insert(Interaction.__table__), mappings)
 
     def get_recent_interactions(self, user_id: str, limit: int = 10) -> List[Interaction]:
         """Get recent interactions for a user.
@@ -394,15 +649,12 @@ class DatabaseManager:
         Returns:
             List[Interaction]: List of interactions ordered by timestamp descending.
         """
-        session = self.get_session()
-        try:
+        with self.get_session() as session:
             return session.query(Interaction)\
                 .filter(Interaction.user_id == user_id)\
                 .order_by(Interaction.timestamp.desc())\
                 .limit(limit)\
                 .all()
-        finally:
-            session.close()
 
     def get_interaction_counts(self, user_id: str) -> Dict[str, int]:
         """Get interaction counts by type for a user.
@@ -413,44 +665,37 @@ class DatabaseManager:
         Returns:
             Dict[str, int]: Dictionary mapping interaction types to their counts.
         """
-        session = self.get_session()
-        try:
-            interactions = session.query(Interaction)\
+        with self.get_session() as session:
+            rows = session.query(Interaction.interaction_type, func.count(Interaction.id))\
                 .filter(Interaction.user_id == user_id)\
+                .group_by(Interaction.interaction_type)\
                 .all()
-            counts = {}
-            for interaction in interactions:
-                counts[interaction.interaction_type] = counts.get(interaction.interaction_type, 0) + 1
-            return counts
-        finally:
-            session.close()
+            return dict(rows)
 
     # Merge request operations
     def create_merge_request(self, source_user_id: str, target_user_id: str, 
-                            source_segment_id: str) -> MergeRequest:
+                            source_segment_id: str,
+                            session: Optional[Session] = None) -> MergeRequest:
         """Create a new merge request.
 
         Args:
             source_user_id: The ID of the user initiating the merge request.
             target_user_id: The ID of the user receiving the merge request.
             source_segment_id: The ID of the story segment to be merged.
+            session: Optional session from session_scope to run in.
 
         Returns:
             MergeRequest: The newly created merge request instance.
         """
-        session = self.get_session()
-        try:
+        with self._use_session(session) as s:
             merge_request = MergeRequest(
                 source_user_id=source_user_id,
                 target_user_id=target_user_id,
                 source_segment_id=source_segment_id
             )
-            session.add(merge_request)
-            session.commit()
-            session.refresh(merge_request)
-            return merge_request
-        finally:
-            session.close()
+            s.add(merge_request)
+            s.flush()
+        return merge_request
 
     def get_pending_merge_requests(self, user_id: str) -> List[MergeRequest]:
         """Get pending merge requests for a user.
@@ -461,14 +706,12 @@ class DatabaseManager:
         Returns:
             List[MergeRequest]: List of pending merge requests targeting this user.
         """
-        session = self.get_session()
-        try:
+        with self.get_session() as session:
             return session.query(MergeRequest)\
+                .options(raiseload('*'))\
                 .filter(MergeRequest.target_user_id == user_id)\
                 .filter(MergeRequest.status == 'pending')\
                 .all()
-        finally:
-            session.close()
 
     def resolve_merge_request(self, request_id: str, accepted: bool) -> Optional[MergeRequest]:
         """Resolve a merge request.
@@ -480,19 +723,17 @@ class DatabaseManager:
         Returns:
             Optional[MergeRequest]: The updated merge request if found, None otherwise.
         """
-        session = self.get_session()
-        try:
-            merge_request = session.query(MergeRequest)\
-                .filter(MergeRequest.id == request_id)\
-                .first()
-            if merge_request:
-                merge_request.status = 'accepted' if accepted else 'rejected'
-                merge_request.resolved_at = datetime.utcnow()
-                session.commit()
-                session.refresh(merge_request)
+        statement = update(MergeRequest)\
+            .where(MergeRequest.id == request_id)\
+            .values(status='accepted' if accepted else 'rejected', resolved_at=_utcnow())
+        with self.get_session() as session:
+            if self.engine.dialect.update_returning:
+                merge_request = session.scalars(statement.returning(MergeRequest)).first()
+            else:
+                session.execute(statement)
+                merge_request = session.get(MergeRequest, request_id)
+            session.commit()
             return merge_request
-        finally:
-            session.close()
 
     def delete_user_data(self, user_id: str) -> bool:
         """Delete all data for a user.
@@ -506,13 +747,10 @@ class DatabaseManager:
         Returns:
             bool: True if the user was found and deleted, False otherwise.
         """
-        session = self.get_session()
-        try:
+        with self.get_session() as session:
             user = session.query(User).filter(User.id == user_id).first()
             if user:
                 session.delete(user)
                 session.commit()
                 return True
             return False
-        finally:
-            session.close()
@@ -0,0 +1,141 @@
+"""
+Shared fixtures for the test suite.
+
+A single in-memory database is built once per test session (per worker
+under pytest-xdist) and handed to every test that needs one; each test
+runs inside a transaction that is rolled back afterwards.
+"""
+
+import copy
+import itertools
+import os
+from uuid import UUID
+
+import pytest
+
+# SQLAlchemy and the models are imported inside the fixtures, so runs that
+# only collect tests without a database never load them.
+
+
+SCHEMA_CACHE_KEY = "infinite-plot-twist/schema_ddl"
+
+# Primary keys handed out by db_manager; never reused within a test session
+_ids = itertools.count(1)
+
+
+def _schema_ddl(cache):
+    """Return the schema as one DDL script, reusing an earlier run's copy.
+
+    The cached copy is keyed on the models source and the SQLAlchemy
+    version, so editing the models or upgrading SQLAlchemy rebuilds it.
+
+    Args:
+        cache: pytest's cache, or None when the cache plugin is disabled.
+
+    Returns:
+        str: The CREATE TABLE and CREATE INDEX statements for every model.
+    """
+    import hashlib
+    
+    import sqlalchemy
+    from src.database import models
+    
+    with open(models.__file__, "rb") as source:
+        digest = hashlib.sha256(source.read() + sqlalchemy.__version__.encode()).hexdigest()
+    cached = cache.get(SCHEMA_CACHE_KEY, None) if cache is not None else None
+    if cached and cached.get("digest") == digest:
+        return cached["ddl"]
+    
+    from sqlalchemy.dialects import sqlite
+    from sqlalchemy.schema import CreateIndex, CreateTable
+    
+    ddl = "".join(
+        f"{statement.compile(dialect=sqlite.dialect())};\n"
+        for table in models.Base.metadata.sorted_tables
+        for statement in [CreateTable(table), *(CreateIndex(index) for index in table.indexes)]
+    )
+    if cache is not None:
+        cache.set(SCHEMA_CACHE_KEY, {"digest": digest, "ddl": ddl})
+    return ddl
+
+
+@pytest.fixture(scope="session")
+def shared_db(pytestconfig):
+    """Create the in-memory database shared by the whole test session.
+
+    The sqlite3 driver is switched to autocommit mode and SQLAlchemy emits
+    BEGIN itself, so that SAVEPOINTs nest inside the outer transaction
+    instead of committing it. Durability is irrelevant here, so syncing
+    and file locking are turned off; the journal is kept in memory rather
+    than disabled, since ROLLBACK needs it.
+
+    The database is named after the pytest-xdist worker, so that each
+    worker of ``pytest -n auto`` builds and uses its own copy.
+
+    Args:
+        pytestconfig: Pytest's config fixture, for its cache.
+
+    Yields:
+        DatabaseManager: A database manager with all tables created.
+    """
+    from sqlalchemy import event
+    
+    from src.database.models import DatabaseManager
+    
+    # The whole schema as one script, so the database is built with a
+    # single executescript call instead of one round trip per statement
+    schema_ddl = _schema_ddl(getattr(pytestconfig, "cache", None))
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    manager = DatabaseManager(
+        f"sqlite:///file:memdb_{worker}?mode=memory&cache=shared&uri=true"
+    )
+    
+    @event.listens_for(manager.engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        for pragma in ("synchronous=OFF", "temp_store=MEMORY", "locking_mode=EXCLUSIVE"):
+            dbapi_connection.execute(f"PRAGMA {pragma}")
+    
+    @event.listens_for(manager.engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+    
+    with manager.engine.connect() as connection:
+        connection.connection.driver_connection.executescript(schema_ddl)
+    
+    yield manager
+    
+    manager.engine.dispose()
+
+
+@pytest.fixture
+def db_manager(shared_db, monkeypatch):
+    """Check out the shared database manager for a single test.
+
+    The shared manager is copied rather than rebuilt, so its engine and
+    connection pool are reused by every test. Sessions are bound to one
+    connection inside an outer transaction, and each session runs in a
+    SAVEPOINT, so commits made by the manager are rolled back with the
+    outer transaction on teardown. Primary keys come from a counter
+    instead of random UUIDs.
+
+    Args:
+        shared_db: The shared in-memory database fixture.
+        monkeypatch: Pytest's monkeypatch fixture.
+
+    Yields:
+        DatabaseManager: A database manager isolated to the current test.
+    """
+    from sqlalchemy.orm import sessionmaker
+    
+    monkeypatch.setattr("src.database.models.uuid4", lambda: UUID(int=next(_ids)))
+    connection = shared_db.engine.connect()
+    transaction = connection.begin()
+    manager = copy.copy(shared_db)
+    manager.Session = sessionmaker(bind=connection, expire_on_commit=False,
+                                   join_transaction_mode="create_savepoint")
+    
+    yield manager
+    
+    transaction.rollback()
+    connection.close()
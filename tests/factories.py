@@ -0,0 +1,43 @@
+"""
+Test data factories.
+
+Helpers that insert batches of rows in a single transaction, so tests do
+not create them one commit at a time.
+"""
+
+from typing import Iterable, List
+
+from src.database.models import DatabaseManager
+
+
+def make_segments(db: DatabaseManager, user_id: str, count: int) -> List[str]:
+    """Insert numbered story segments for a user.
+
+    Args:
+        db: The database manager to insert through.
+        user_id: The ID of the user the segments belong to.
+        count: How many segments to insert, numbered from 0.
+
+    Returns:
+        List[str]: The segment contents, in sequence order.
+    """
+    contents = [f"Segment {i}" for i in range(count)]
+    db.create_story_segments(user_id, [
+        {"content": content, "sequence_number": i} for i, content in enumerate(contents)
+    ])
+    return contents
+
+
+def make_interactions(db: DatabaseManager, user_id: str,
+                      interaction_types: Iterable[str]) -> None:
+    """Insert one interaction per type given, in order.
+
+    Args:
+        db: The database manager to insert through.
+        user_id: The ID of the user performing the interactions.
+        interaction_types: The type of each interaction to insert.
+    """
+    db.record_interactions([
+        {"user_id": user_id, "interaction_type": interaction_type}
+        for interaction_type in interaction_types
+    ])
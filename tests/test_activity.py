@@ -0,0 +1,215 @@
+"""
+Tests for the activity buffer.
+
+This module contains tests for batching user activity timestamps
+before they are written to the database.
+"""
+
+import pytest
+
+from src.backend.activity import ActivityBuffer, InteractionBuffer, _flush_all
+
+
+def _fail(*args):
+    """Stand in for a database write that fails.
+
+    Raises:
+        RuntimeError: Always.
+    """
+    raise RuntimeError('database unavailable')
+
+
+@pytest.fixture(autouse=True)
+def flush_leftovers(db_manager):
+    """Flush writes a test left queued while its database is still open.
+
+    Args:
+        db_manager: The database manager fixture.
+
+    Yields:
+        None: Control returns once the test has finished.
+    """
+    yield
+    
+    _flush_all()
+
+
+@pytest.fixture
+def buffer(db_manager):
+    """Create an activity buffer that never flushes on its own.
+
+    Args:
+        db_manager: The database manager fixture.
+
+    Returns:
+        ActivityBuffer: A buffer with a very long flush interval.
+    """
+    return ActivityBuffer(db_manager, interval=3600)
+
+
+class TestActivityBuffer:
+    """Tests for ActivityBuffer."""
+
+    def test_record_does_not_write(self, db_manager, buffer):
+        """Test that recording activity leaves the database untouched.
+
+        Args:
+            db_manager: The database manager fixture.
+            buffer: The activity buffer fixture.
+        """
+        user = db_manager.create_user('session-1')
+        
+        buffer.record(user.id)
+        
+        assert db_manager.get_user_by_id(user.id).last_active == user.last_active
+
+    def test_flush_writes_pending(self, db_manager, buffer):
+        """Test that flushing writes the recorded timestamps.
+
+        Args:
+            db_manager: The database manager fixture.
+            buffer: The activity buffer fixture.
+        """
+        user = db_manager.create_user('session-1')
+        
+        buffer.record(user.id)
+        
+        assert buffer.flush() == 1
+        assert db_manager.get_user_by_id(user.id).last_active > user.last_active
+
+    def test_records_coalesce_per_user(self, db_manager, buffer):
+        """Test that repeated activity by one user is written once.
+
+        Args:
+            db_manager: The database manager fixture.
+            buffer: The activity buffer fixture.
+        """
+        user = db_manager.create_user('session-1')
+        
+        buffer.record(user.id)
+        buffer.record(user.id)
+        
+        assert buffer.flush() == 1
+
+    def test_flush_empty(self, buffer):
+        """Test that flushing with nothing recorded is a no-op.
+
+        Args:
+            buffer: The activity buffer fixture.
+        """
+        assert buffer.flush() == 0
+
+    def test_failed_flush_keeps_pending(self, db_manager, buffer, monkeypatch):
+        """Test that timestamps are queued again when the write fails.
+
+        Args:
+            db_manager: The database manager fixture.
+            buffer: The activity buffer fixture.
+            monkeypatch: Pytest's monkeypatch fixture.
+        """
+        user = db_manager.create_user('session-1')
+        buffer.record(user.id)
+        
+        with monkeypatch.context() as patch:
+            patch.setattr(db_manager, 'update_users_activity', _fail)
+            assert buffer.flush() == 0
+        
+        assert buffer._timer is not None
+        assert buffer.flush() == 1
+        assert db_manager.get_user_by_id(user.id).last_active > user.last_active
+
+    def test_timer_flushes(self, db_manager):
+        """Test that the scheduled flush runs on a background thread.
+
+        Args:
+            db_manager: The database manager fixture.
+        """
+        buffer = ActivityBuffer(db_manager, interval=0.05)
+        user = db_manager.create_user('session-1')
+        
+        buffer.record(user.id)
+        timer = buffer._timer
+        timer.join(timeout=5)
+        
+        assert db_manager.get_user_by_id(user.id).last_active > user.last_active
+
+
+class TestInteractionBuffer:
+    """Tests for InteractionBuffer."""
+
+    def test_record_does_not_write(self, db_manager):
+        """Test that queued interactions are not written immediately.
+
+        Args:
+            db_manager: The database manager fixture.
+        """
+        buffer = InteractionBuffer(db_manager, batch_size=10, interval=3600)
+        user = db_manager.create_user('session-1')
+        
+        buffer.record(user.id, 'click', {'type': 'click'})
+        
+        assert db_manager.get_recent_interactions(user.id) == []
+
+    def test_flush_writes_pending(self, db_manager):
+        """Test that flushing inserts every queued interaction.
+
+        Args:
+            db_manager: The database manager fixture.
+        """
+        buffer = InteractionBuffer(db_manager, batch_size=10, interval=3600)
+        user = db_manager.create_user('session-1')
+        
+        buffer.record(user.id, 'click', {'type': 'click', 'x': 1})
+        buffer.record(user.id, 'scroll')
+        
+        assert buffer.flush() == 2
+        assert db_manager.get_interaction_counts(user.id) == {'click': 1, 'scroll': 1}
+        stored = {i.interaction_type: i.to_dict() for i in db_manager.get_recent_interactions(user.id)}
+        assert stored['click']['data'] == {'type': 'click', 'x': 1}
+        assert stored['scroll']['data'] is None
+
+    def test_full_batch_writes(self, db_manager):
+        """Test that reaching the batch size writes the batch.
+
+        Args:
+            db_manager: The database manager fixture.
+        """
+        buffer = InteractionBuffer(db_manager, batch_size=2, interval=3600)
+        user = db_manager.create_user('session-1')
+        
+        buffer.record(user.id, 'click')
+        buffer.record(user.id, 'click')
+        
+        assert db_manager.get_interaction_counts(user.id) == {'click': 2}
+        assert buffer.flush() == 0
+
+    def test_bad_row_does_not_drop_batch(self, db_manager):
+        """Test that a row the database rejects only drops itself.
+
+        Args:
+            db_manager: The database manager fixture.
+        """
+        buffer = InteractionBuffer(db_manager, batch_size=3, interval=3600)
+        user = db_manager.create_user('session-1')
+        
+        buffer.record(user.id, 'click')
+        buffer.record(user.id, ['bad'])
+        buffer.record(user.id, 'scroll')
+        
+        assert db_manager.get_interaction_counts(user.id) == {'click': 1, 'scroll': 1}
+        assert buffer.flush() == 0
+
+    def test_timer_flushes(self, db_manager):
+        """Test that the scheduled flush runs on a background thread.
+
+        Args:
+            db_manager: The database manager fixture.
+        """
+        buffer = InteractionBuffer(db_manager, interval=0.05)
+        user = db_manager.create_user('session-1')
+        
+        buffer.record(user.id, 'keypress', {'key': 'a'})
+        timer = buffer._timer
+        timer.join(timeout=5)
+        
+        assert db_manager.get_interaction_counts(user.id) == {'keypress': 1}
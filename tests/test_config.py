@@ -0,0 +1,66 @@
+"""
+Tests for the application settings.
+
+This module contains tests for parsing the settings snapshot from
+environment variables.
+"""
+
+import dataclasses
+
+import pytest
+
+from src.backend.config import Settings
+
+
+class TestSettingsFromEnv:
+    """Tests for Settings.from_env."""
+
+    def test_defaults(self):
+        """Test that unset variables fall back to defaults."""
+        settings = Settings.from_env({})
+
+        assert settings.secret_key == 'dev-secret-key'
+        assert settings.database_url == 'sqlite:///stories.db'
+        assert settings.redis_url is None
+        assert settings.session_ttl == 1800
+        assert settings.max_sessions == 10000
+        assert settings.db_pool_size == 50
+        assert settings.db_pool_pre_ping is False
+        assert settings.activity_flush_interval == 5.0
+        assert settings.interaction_batch_size == 64
+        assert settings.host == '0.0.0.0'
+        assert settings.port == 5000
+        assert settings.debug is False
+        assert settings.async_mode == 'eventlet'
+
+    def test_parses_values(self):
+        """Test that set variables are parsed into typed fields."""
+        settings = Settings.from_env({
+            'SECRET_KEY': 'secret',
+            'REDIS_URL': 'redis://localhost:6379/0',
+            'SESSION_TTL': '60',
+            'PORT': '8080',
+            'DB_POOL_PRE_PING': '1',
+            'FLASK_DEBUG': '1'
+        })
+
+        assert settings.secret_key == 'secret'
+        assert settings.redis_url == 'redis://localhost:6379/0'
+        assert settings.session_ttl == 60
+        assert settings.port == 8080
+        assert settings.db_pool_pre_ping is True
+        assert settings.debug is True
+
+    def test_empty_values_use_defaults(self):
+        """Test that empty variables, as in .env.example, use defaults."""
+        settings = Settings.from_env({'REDIS_URL': '', 'PORT': ''})
+
+        assert settings.redis_url is None
+        assert settings.port == 5000
+
+    def test_settings_are_frozen(self):
+        """Test that settings cannot be modified after parsing."""
+        settings = Settings.from_env({})
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            settings.port = 1
@@ -5,10 +5,12 @@ This module contains comprehensive tests for the database layer
 including models and CRUD operations.
 """
 
+from contextlib import contextmanager
+
 import pytest
-import os
-import tempfile
 from datetime import datetime, timedelta
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import InvalidRequestError
 
 from src.database.models import (
     DatabaseManager,
@@ -18,44 +20,79 @@ from src.database.models import (
     MergeRequest,
     Base
 )
+from tests.factories import make_interactions, make_segments
 
 
-@pytest.fixture
-def db_manager():
-    """Create a temporary database for testing.
+@contextmanager
+def count_queries(engine):
+    """Count the SQL statements executed on an engine.
+
+    Args:
+        engine: The engine to listen on.
 
     Yields:
-        DatabaseManager: A database manager instance connected to a
-            temporary SQLite database that is cleaned up after use.
+        List[str]: The statements executed so far, filled in as they run.
     """
-    # Use a temporary file for SQLite
-    fd, path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
+    statements = []
     
-    manager = DatabaseManager(f"sqlite:///{path}")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def file_db_manager(tmp_path):
+    """Create a database manager backed by a temporary SQLite file.
+
+    Used by tests that run DDL or need file-only features such as WAL.
+
+    Args:
+        tmp_path: Pytest's temporary directory fixture.
+
+    Yields:
+        DatabaseManager: A database manager with all tables created.
+    """
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
     manager.create_tables()
     
     yield manager
     
-    # Cleanup
-    manager.drop_tables()
-    try:
-        os.unlink(path)
-    except:
-        pass
+    manager.engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def seeded_user_id(shared_db):
+    """Insert the sample user once, outside any per-test transaction.
+
+    Args:
+        shared_db: The shared in-memory database fixture.
+
+    Returns:
+        str: The ID of the seeded user.
+    """
+    return shared_db.create_user("test-session-123").id
 
 
 @pytest.fixture
-def sample_user(db_manager):
-    """Create a sample user for testing.
+def sample_user(db_manager, seeded_user_id):
+    """Load the seeded sample user for testing.
+
+    Tests that modify or delete the user only do so inside their own
+    transaction, which is rolled back on teardown.
 
     Args:
         db_manager: The database manager fixture.
+        seeded_user_id: The seeded user ID fixture.
 
     Returns:
         User: A test user with session ID 'test-session-123'.
     """
-    return db_manager.create_user("test-session-123")
+    return db_manager.get_user_by_id(seeded_user_id)
 
 
 class TestDatabaseManagerInit:
@@ -78,22 +115,25 @@ class TestDatabaseManagerInit:
         assert db_manager.Session is not None
 
     def test_create_tables(self, db_manager):
-        """Test that create_tables works without error.
+        """Test that the session-wide schema has every table.
 
         Args:
             db_manager: The database manager fixture.
         """
-        db_manager.create_tables()
-        # If we get here without exception, tables were created
+        with db_manager.get_session() as session:
+            tables = inspect(session.connection()).get_table_names()
+        
+        assert set(Base.metadata.tables) <= set(tables)
 
-    def test_drop_tables(self, db_manager):
-        """Test that drop_tables works without error.
+    def test_drop_tables(self, file_db_manager):
+        """Test that drop_tables removes every table.
 
         Args:
-            db_manager: The database manager fixture.
+            file_db_manager: The file database manager fixture.
         """
-        db_manager.drop_tables()
-        db_manager.create_tables()  # Recreate for other tests
+        file_db_manager.drop_tables()
+        
+        assert inspect(file_db_manager.engine).get_table_names() == []
 
     def test_get_session(self, db_manager):
         """Test getting a database session.
@@ -106,6 +146,125 @@ class TestDatabaseManagerInit:
         session.close()
 
 
+class TestEngineConfiguration:
+    """Tests for engine and connection setup."""
+
+    def test_sqlite_uses_wal(self, file_db_manager):
+        """Test that SQLite connections use write-ahead logging.
+
+        Args:
+            file_db_manager: The file database manager fixture.
+        """
+        with file_db_manager.engine.connect() as connection:
+            mode = connection.exec_driver_sql('PRAGMA journal_mode').scalar()
+        
+        assert mode == 'wal'
+
+    def test_engine_kwargs_size_the_pool(self, tmp_path):
+        """Test that engine options are passed through to the pool.
+
+        Args:
+            tmp_path: Pytest's temporary directory fixture.
+        """
+        manager = DatabaseManager(f"sqlite:///{tmp_path / 'pool.db'}",
+                                  engine_kwargs={'pool_size': 3})
+        
+        assert manager.engine.pool.size() == 3
+        manager.engine.dispose()
+
+    def test_story_segment_reads_use_index(self, db_manager):
+        """Test that segment pages are read through the composite index.
+
+        Args:
+            db_manager: The database manager fixture.
+        """
+        with db_manager.get_session() as session:
+            plan = session.connection().exec_driver_sql(
+                'EXPLAIN QUERY PLAN SELECT content FROM story_segments '
+                "WHERE user_id = 'u' ORDER BY sequence_number"
+            ).fetchall()
+        details = ' '.join(row[-1] for row in plan)
+        
+        assert 'ix_segments_user_seq' in details
+        assert 'TEMP B-TREE' not in details
+
+    def test_latest_segment_read_uses_index(self, db_manager):
+        """Test that the latest segment is found without a scan or sort.
+
+        Args:
+            db_manager: The database manager fixture.
+        """
+        with db_manager.get_session() as session:
+            plan = session.connection().exec_driver_sql(
+                'EXPLAIN QUERY PLAN SELECT id FROM story_segments '
+                "WHERE user_id = 'u' ORDER BY sequence_number DESC LIMIT 1"
+            ).fetchall()
+        details = ' '.join(row[-1] for row in plan)
+        
+        assert 'ix_segments_user_seq' in details
+        assert 'SCAN story_segments' not in details
+        assert 'TEMP B-TREE' not in details
+
+
+class TestSessionScope:
+    """Tests for running several operations in one transaction."""
+
+    def test_session_scope_commits_all_operations(self, db_manager, sample_user):
+        """Test that operations sharing a scope are committed together.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        with db_manager.session_scope() as session:
+            db_manager.record_interaction(
+                user_id=sample_user.id, interaction_type="click", session=session
+            )
+            segment = db_manager.create_story_segment(
+                user_id=sample_user.id, content="Shared", sequence_number=0,
+                session=session
+            )
+            db_manager.update_user_activity(sample_user.id, session=session)
+        
+        assert db_manager.get_segment_by_id(segment.id).content == "Shared"
+        assert db_manager.get_interaction_counts(sample_user.id) == {"click": 1}
+
+    def test_session_scope_rolls_back_on_error(self, db_manager, sample_user):
+        """Test that an error inside a scope discards all of its work.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        with pytest.raises(RuntimeError):
+            with db_manager.session_scope() as session:
+                db_manager.create_story_segment(
+                    user_id=sample_user.id, content="Discarded", sequence_number=0,
+                    session=session
+                )
+                raise RuntimeError("boom")
+        
+        assert db_manager.get_latest_segment(sample_user.id) is None
+
+    def test_get_latest_segment_in_scope(self, db_manager, sample_user):
+        """Test that a scope sees segments it has not committed yet.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        with db_manager.session_scope() as session:
+            db_manager.create_story_segment(
+                user_id=sample_user.id, content="First", sequence_number=0,
+                session=session
+            )
+            latest = db_manager.get_latest_segment(
+                sample_user.id, session=session, for_update=True
+            )
+        
+        assert latest.content == "First"
+
+
 class TestUserOperations:
     """Tests for user CRUD operations."""
 
@@ -122,6 +281,21 @@ class TestUserOperations:
         assert user.session_id == "new-session-456"
         assert user.created_at is not None
 
+    def test_ids_are_hex(self, db_manager, sample_user):
+        """Test that primary keys are 32 hex digits without dashes.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        segment = db_manager.create_story_segment(
+            user_id=sample_user.id, content="Hex", sequence_number=0
+        )
+        
+        for key in (sample_user.id, segment.id):
+            assert len(key) == 32
+            int(key, 16)
+
     def test_get_user_by_session(self, db_manager, sample_user):
         """Test retrieving a user by session ID.
 
@@ -182,6 +356,24 @@ class TestUserOperations:
         # The time should be updated (or at least not raise an error)
         assert user is not None
 
+    def test_update_users_activity(self, db_manager):
+        """Test setting several activity timestamps in one update.
+
+        Args:
+            db_manager: The database manager fixture.
+        """
+        first = db_manager.create_user("session-a")
+        second = db_manager.create_user("session-b")
+        stamps = {
+            first.id: datetime(2030, 1, 1, 12, 0, 0),
+            second.id: datetime(2030, 1, 2, 12, 0, 0)
+        }
+        
+        db_manager.update_users_activity(stamps)
+        
+        assert db_manager.get_user_by_id(first.id).last_active == stamps[first.id]
+        assert db_manager.get_user_by_id(second.id).last_active == stamps[second.id]
+
     def test_get_active_users(self, db_manager, sample_user):
         """Test getting active users.
 
@@ -194,6 +386,21 @@ class TestUserOperations:
         assert len(users) >= 1
         assert any(u.id == sample_user.id for u in users)
 
+    def test_get_active_users_does_not_lazy_load(self, db_manager, sample_user):
+        """Test that active users come back in one query with no lazy loads.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        with count_queries(db_manager.engine) as statements:
+            users = db_manager.get_active_users(minutes=60)
+            [user.to_dict() for user in users]
+        
+        assert len([s for s in statements if s.startswith("SELECT")]) == 1
+        with pytest.raises(InvalidRequestError, match="lazy='raise'"):
+            users[0].stories
+
     def test_delete_user_data(self, db_manager, sample_user):
         """Test deleting user data.
 
@@ -289,12 +496,7 @@ class TestStorySegmentOperations:
             sample_user: The sample user fixture.
         """
         # Create multiple segments
-        for i in range(5):
-            db_manager.create_story_segment(
-                user_id=sample_user.id,
-                content=f"Segment {i}",
-                sequence_number=i
-            )
+        make_segments(db_manager, sample_user.id, 5)
         
         segments = db_manager.get_story_segments(sample_user.id)
         
@@ -309,12 +511,7 @@ class TestStorySegmentOperations:
             db_manager: The database manager fixture.
             sample_user: The sample user fixture.
         """
-        for i in range(10):
-            db_manager.create_story_segment(
-                user_id=sample_user.id,
-                content=f"Segment {i}",
-                sequence_number=i
-            )
+        make_segments(db_manager, sample_user.id, 10)
         
         segments = db_manager.get_story_segments(sample_user.id, limit=3)
         
@@ -327,18 +524,56 @@ class TestStorySegmentOperations:
             db_manager: The database manager fixture.
             sample_user: The sample user fixture.
         """
-        for i in range(10):
-            db_manager.create_story_segment(
-                user_id=sample_user.id,
-                content=f"Segment {i}",
-                sequence_number=i
-            )
+        make_segments(db_manager, sample_user.id, 10)
         
         segments = db_manager.get_story_segments(sample_user.id, limit=3, offset=5)
         
         assert len(segments) == 3
         assert segments[0].sequence_number == 5
 
+    def test_get_story_segments_does_not_lazy_load(self, db_manager, sample_user):
+        """Test that segments come back in one query with no lazy loads.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        make_segments(db_manager, sample_user.id, 5)
+        
+        with count_queries(db_manager.engine) as statements:
+            segments = db_manager.get_story_segments(sample_user.id)
+            [segment.to_dict() for segment in segments]
+        
+        assert len([s for s in statements if s.startswith("SELECT")]) == 1
+        with pytest.raises(InvalidRequestError, match="lazy='raise'"):
+            segments[0].parent
+
+    def test_iter_story_segments(self, db_manager, sample_user):
+        """Test iterating over a page of segments in story order.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        make_segments(db_manager, sample_user.id, 5)
+        
+        segments = db_manager.iter_story_segments(sample_user.id, limit=3, offset=1)
+        
+        assert [s.content for s in segments] == ["Segment 1", "Segment 2", "Segment 3"]
+
+    def test_get_recent_segments(self, db_manager, sample_user):
+        """Test getting the last segments in story order.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        make_segments(db_manager, sample_user.id, 5)
+        
+        segments = db_manager.get_recent_segments(sample_user.id, limit=2)
+        
+        assert [s.sequence_number for s in segments] == [3, 4]
+
     def test_get_latest_segment(self, db_manager, sample_user):
         """Test getting the latest story segment.
 
@@ -346,12 +581,7 @@ class TestStorySegmentOperations:
             db_manager: The database manager fixture.
             sample_user: The sample user fixture.
         """
-        for i in range(5):
-            db_manager.create_story_segment(
-                user_id=sample_user.id,
-                content=f"Segment {i}",
-                sequence_number=i
-            )
+        make_segments(db_manager, sample_user.id, 5)
         
         latest = db_manager.get_latest_segment(sample_user.id)
         
@@ -418,6 +648,86 @@ class TestStorySegmentOperations:
         
         assert story == "Once upon a time there was a hero who saved the day."
 
+    def test_get_full_story_follows_sequence(self, db_manager, sample_user):
+        """Test that the story is joined in sequence order, not insert order.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        db_manager.create_story_segments(sample_user.id, [
+            {"content": "third", "sequence_number": 2},
+            {"content": "first", "sequence_number": 0},
+            {"content": "second", "sequence_number": 1},
+        ])
+        
+        assert db_manager.get_full_story(sample_user.id) == "first second third"
+
+    def test_get_full_story_reverse_inserts(self, db_manager, sample_user):
+        """Test that segments inserted newest first are joined oldest first.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        for number in reversed(range(10)):
+            db_manager.create_story_segment(
+                user_id=sample_user.id, content=str(number), sequence_number=number
+            )
+        
+        assert db_manager.get_full_story(sample_user.id) == "0 1 2 3 4 5 6 7 8 9"
+
+    def test_get_full_story_empty(self, db_manager, sample_user):
+        """Test that a user without segments has an empty story.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        assert db_manager.get_full_story(sample_user.id) == ""
+
+    def test_count_story_words(self, db_manager, sample_user):
+        """Test that words are counted across every segment.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        for number, content in enumerate(["Once upon a time", "the end"]):
+            db_manager.create_story_segment(
+                user_id=sample_user.id, content=content, sequence_number=number
+            )
+        
+        assert db_manager.count_story_words(sample_user.id) == 6
+
+    def test_count_story_words_empty(self, db_manager, sample_user):
+        """Test that a user without segments has no words.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        assert db_manager.count_story_words(sample_user.id) == 0
+
+    def test_create_story_segments(self, db_manager, sample_user):
+        """Test inserting several segments in one call.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        db_manager.create_story_segments(sample_user.id, [
+            {"content": "First", "sequence_number": 0},
+            {"content": "Merged", "sequence_number": 1, "is_merged": True,
+             "merged_from": ["a", "b"]}
+        ])
+        
+        segments = db_manager.get_story_segments(sample_user.id)
+        
+        assert [s.content for s in segments] == ["First", "Merged"]
+        assert segments[0].to_dict()["merged_from"] is None
+        assert segments[1].to_dict()["merged_from"] == ["a", "b"]
+
 
 class TestInteractionOperations:
     """Tests for interaction CRUD operations."""
@@ -461,11 +771,7 @@ class TestInteractionOperations:
             db_manager: The database manager fixture.
             sample_user: The sample user fixture.
         """
-        for i in range(5):
-            db_manager.record_interaction(
-                user_id=sample_user.id,
-                interaction_type=f"type_{i}"
-            )
+        make_interactions(db_manager, sample_user.id, (f"type_{i}" for i in range(5)))
         
         interactions = db_manager.get_recent_interactions(sample_user.id)
         
@@ -478,11 +784,7 @@ class TestInteractionOperations:
             db_manager: The database manager fixture.
             sample_user: The sample user fixture.
         """
-        for i in range(10):
-            db_manager.record_interaction(
-                user_id=sample_user.id,
-                interaction_type=f"type_{i}"
-            )
+        make_interactions(db_manager, sample_user.id, (f"type_{i}" for i in range(10)))
         
         interactions = db_manager.get_recent_interactions(sample_user.id, limit=3)
         
@@ -495,18 +797,7 @@ class TestInteractionOperations:
             db_manager: The database manager fixture.
             sample_user: The sample user fixture.
         """
-        for _ in range(3):
-            db_manager.record_interaction(
-                user_id=sample_user.id, interaction_type="click"
-            )
-        for _ in range(5):
-            db_manager.record_interaction(
-                user_id=sample_user.id, interaction_type="scroll"
-            )
-        for _ in range(2):
-            db_manager.record_interaction(
-                user_id=sample_user.id, interaction_type="keypress"
-            )
+        make_interactions(db_manager, sample_user.id, ["click"] * 3 + ["scroll"] * 5 + ["keypress"] * 2)
         
         counts = db_manager.get_interaction_counts(sample_user.id)
         
@@ -514,6 +805,27 @@ class TestInteractionOperations:
         assert counts["scroll"] == 5
         assert counts["keypress"] == 2
 
+    def test_record_interactions_mixed_rows(self, db_manager, sample_user):
+        """Test that rows with and without optional values insert together.
+
+        Args:
+            db_manager: The database manager fixture.
+            sample_user: The sample user fixture.
+        """
+        timestamp = datetime(2024, 1, 1)
+        db_manager.record_interactions([])
+        db_manager.record_interactions([
+            {"user_id": sample_user.id, "interaction_type": "click", "data": {"x": 1}},
+            {"user_id": sample_user.id, "interaction_type": "scroll", "timestamp": timestamp},
+        ])
+        
+        stored = {i.interaction_type: i for i in db_manager.get_recent_interactions(sample_user.id)}
+        
+        assert stored["click"].to_dict()["data"] == {"x": 1}
+        assert stored["click"].timestamp is not None
+        assert stored["scroll"].data is None
+        assert stored["scroll"].timestamp == timestamp
+
 
 class TestMergeRequestOperations:
     """Tests for merge request CRUD operations."""
@@ -524,11 +836,12 @@ class TestMergeRequestOperations:
         Args:
             db_manager: The database manager fixture.
         """
-        user1 = db_manager.create_user("session-1")
-        user2 = db_manager.create_user("session-2")
-        segment = db_manager.create_story_segment(
-            user_id=user1.id, content="Test", sequence_number=0
-        )
+        with db_manager.session_scope() as session:
+            user1 = db_manager.create_user("session-1", session=session)
+            user2 = db_manager.create_user("session-2", session=session)
+            segment = db_manager.create_story_segment(
+                user_id=user1.id, content="Test", sequence_number=0, session=session
+            )
         
         merge_request = db_manager.create_merge_request(
             source_user_id=user1.id,
@@ -547,22 +860,26 @@ class TestMergeRequestOperations:
         Args:
             db_manager: The database manager fixture.
         """
-        user1 = db_manager.create_user("session-1")
-        user2 = db_manager.create_user("session-2")
-        segment = db_manager.create_story_segment(
-            user_id=user1.id, content="Test", sequence_number=0
-        )
-        
-        db_manager.create_merge_request(
-            source_user_id=user1.id,
-            target_user_id=user2.id,
-            source_segment_id=segment.id
-        )
+        with db_manager.session_scope() as session:
+            user1 = db_manager.create_user("session-1", session=session)
+            user2 = db_manager.create_user("session-2", session=session)
+            segment = db_manager.create_story_segment(
+                user_id=user1.id, content="Test", sequence_number=0, session=session
+            )
+            db_manager.create_merge_request(
+                source_user_id=user1.id,
+                target_user_id=user2.id,
+                source_segment_id=segment.id,
+                session=session
+            )
         
-        requests = db_manager.get_pending_merge_requests(user2.id)
+        with count_queries(db_manager.engine) as statements:
+            requests = db_manager.get_pending_merge_requests(user2.id)
+            [request.to_dict() for request in requests]
         
         assert len(requests) == 1
         assert requests[0].target_user_id == user2.id
+        assert len([s for s in statements if s.startswith("SELECT")]) == 1
 
     def test_resolve_merge_request_accept(self, db_manager):
         """Test accepting a merge request.
@@ -570,17 +887,18 @@ class TestMergeRequestOperations:
         Args:
             db_manager: The database manager fixture.
         """
-        user1 = db_manager.create_user("session-1")
-        user2 = db_manager.create_user("session-2")
-        segment = db_manager.create_story_segment(
-            user_id=user1.id, content="Test", sequence_number=0
-        )
-        
-        merge_request = db_manager.create_merge_request(
-            source_user_id=user1.id,
-            target_user_id=user2.id,
-            source_segment_id=segment.id
-        )
+        with db_manager.session_scope() as session:
+            user1 = db_manager.create_user("session-1", session=session)
+            user2 = db_manager.create_user("session-2", session=session)
+            segment = db_manager.create_story_segment(
+                user_id=user1.id, content="Test", sequence_number=0, session=session
+            )
+            merge_request = db_manager.create_merge_request(
+                source_user_id=user1.id,
+                target_user_id=user2.id,
+                source_segment_id=segment.id,
+                session=session
+            )
         
         resolved = db_manager.resolve_merge_request(merge_request.id, accepted=True)
         
@@ -594,17 +912,18 @@ class TestMergeRequestOperations:
         Args:
             db_manager: The database manager fixture.
         """
-        user1 = db_manager.create_user("session-1")
-        user2 = db_manager.create_user("session-2")
-        segment = db_manager.create_story_segment(
-            user_id=user1.id, content="Test", sequence_number=0
-        )
-        
-        merge_request = db_manager.create_merge_request(
-            source_user_id=user1.id,
-            target_user_id=user2.id,
-            source_segment_id=segment.id
-        )
+        with db_manager.session_scope() as session:
+            user1 = db_manager.create_user("session-1", session=session)
+            user2 = db_manager.create_user("session-2", session=session)
+            segment = db_manager.create_story_segment(
+                user_id=user1.id, content="Test", sequence_number=0, session=session
+            )
+            merge_request = db_manager.create_merge_request(
+                source_user_id=user1.id,
+                target_user_id=user2.id,
+                source_segment_id=segment.id,
+                session=session
+            )
         
         resolved = db_manager.resolve_merge_request(merge_request.id, accepted=False)
         
@@ -621,6 +940,31 @@ class TestMergeRequestOperations:
         
         assert resolved is None
 
+    def test_resolve_merge_request_without_returning(self, db_manager, monkeypatch):
+        """Test resolving on a database without UPDATE ... RETURNING.
+
+        Args:
+            db_manager: The database manager fixture.
+            monkeypatch: Pytest's monkeypatch fixture.
+        """
+        with db_manager.session_scope() as session:
+            user1 = db_manager.create_user("session-1", session=session)
+            user2 = db_manager.create_user("session-2", session=session)
+            segment = db_manager.create_story_segment(
+                user_id=user1.id, content="Test", sequence_number=0, session=session
+            )
+        merge_request = db_manager.create_merge_request(
+            source_user_id=user1.id,
+            target_user_id=user2.id,
+            source_segment_id=segment.id
+        )
+        monkeypatch.setattr(db_manager.engine.dialect, 'update_returning', False)
+        
+        resolved = db_manager.resolve_merge_request(merge_request.id, accepted=True)
+        
+        assert resolved.status == "accepted"
+        assert db_manager.resolve_merge_request("nonexistent-id", accepted=True) is None
+
 
 class TestModelToDictMethods:
     """Tests for model to_dict conversion methods."""
@@ -688,17 +1032,18 @@ class TestModelToDictMethods:
         Args:
             db_manager: The database manager fixture.
         """
-        user1 = db_manager.create_user("session-1")
-        user2 = db_manager.create_user("session-2")
-        segment = db_manager.create_story_segment(
-            user_id=user1.id, content="Test", sequence_number=0
-        )
-        
-        merge_request = db_manager.create_merge_request(
-            source_user_id=user1.id,
-            target_user_id=user2.id,
-            source_segment_id=segment.id
-        )
+        with db_manager.session_scope() as session:
+            user1 = db_manager.create_user("session-1", session=session)
+            user2 = db_manager.create_user("session-2", session=session)
+            segment = db_manager.create_story_segment(
+                user_id=user1.id, content="Test", sequence_number=0, session=session
+            )
+            merge_request = db_manager.create_merge_request(
+                source_user_id=user1.id,
+                target_user_id=user2.id,
+                source_segment_id=segment.id,
+                session=session
+            )
         
         request_dict = merge_request.to_dict()
         
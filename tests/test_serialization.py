@@ -0,0 +1,87 @@
+"""
+Tests for the orjson-backed serialization helpers.
+
+This module contains tests for the Flask JSON provider and the
+Socket.IO json module replacement.
+"""
+
+import decimal
+from datetime import datetime
+
+import pytest
+from flask import Flask, jsonify
+
+from src.backend.serialization import OrjsonProvider, SocketIOJson
+
+
+@pytest.fixture
+def app():
+    """Create a bare Flask app using the orjson provider.
+
+    Returns:
+        Flask: An application with OrjsonProvider installed.
+    """
+    application = Flask(__name__)
+    application.json = OrjsonProvider(application)
+    return application
+
+
+class TestOrjsonProvider:
+    """Tests for OrjsonProvider."""
+
+    def test_jsonify_response(self, app):
+        """Test that jsonify builds an application/json response.
+
+        Args:
+            app: The Flask application fixture.
+        """
+        with app.app_context():
+            response = jsonify({'b': 1, 'a': 2})
+        
+        assert response.mimetype == 'application/json'
+        assert response.data == b'{"a":2,"b":1}'
+
+    def test_unsorted_keys(self, app):
+        """Test that key sorting can be disabled.
+
+        Args:
+            app: The Flask application fixture.
+        """
+        app.json.sort_keys = False
+        
+        assert app.json.dumps({'b': 1, 'a': 2}) == '{"b":1,"a":2}'
+
+    def test_serializes_datetime_and_decimal(self, app):
+        """Test serialization of types beyond plain JSON.
+
+        Args:
+            app: The Flask application fixture.
+        """
+        data = {'at': datetime(2030, 1, 1, 12, 0), 'price': decimal.Decimal('1.50')}
+        
+        assert app.json.loads(app.json.dumps(data)) == {
+            'at': '2030-01-01T12:00:00',
+            'price': '1.50'
+        }
+
+    def test_unserializable_raises(self, app):
+        """Test that unknown types raise TypeError.
+
+        Args:
+            app: The Flask application fixture.
+        """
+        with pytest.raises(TypeError):
+            app.json.dumps({'value': object()})
+
+
+class TestSocketIOJson:
+    """Tests for SocketIOJson."""
+
+    def test_round_trip(self):
+        """Test that payloads survive encoding with stdlib-style kwargs."""
+        payload = {'segment': {'content': 'Once upon a time'}, 'n': [1, 2]}
+        
+        encoded = SocketIOJson.dumps(payload, separators=(',', ':'))
+        
+        assert isinstance(encoded, str)
+        assert SocketIOJson.loads(encoded) == payload
@@ -0,0 +1,521 @@
+"""
+Tests for the session store.
+
+This module contains tests for the in-memory and Redis session stores
+and the store factory used by the Flask application.
+"""
+
+import fnmatch
+
+import pytest
+
+from src.backend.session_store import (
+    MAX_STORY_PAGES,
+    MemorySessionStore,
+    RedisSessionStore,
+    TTLCache,
+    create_session_store
+)
+from src.backend.story_generator import StoryGenerator
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.Redis the store uses.
+
+    Values are kept as bytes, as redis-py returns them, and the last
+    expiry set on each key is recorded in ttls.
+    """
+
+    def __init__(self):
+        """Initialize an empty fake server."""
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        """Get the value of a key, or None if it is missing."""
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        """Set a key with an expiry."""
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        self.ttls[key] = ttl
+
+    def delete(self, *keys):
+        """Delete keys, returning how many existed."""
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def incr(self, key):
+        """Increment an integer key, starting from zero."""
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def expire(self, key, ttl):
+        """Set the expiry of a key."""
+        self.ttls[key] = ttl
+
+    def scan_iter(self, match):
+        """Iterate over the keys matching a glob pattern."""
+        return (key for key in list(self.data) if fnmatch.fnmatchcase(key, match))
+
+    def pipeline(self):
+        """Create a pipeline that runs its commands on execute."""
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues FakeRedis commands until execute is called."""
+
+    def __init__(self, client):
+        """Initialize an empty pipeline for the given fake client."""
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        """Queue a call to the client method of the same name."""
+        method = getattr(self.client, name)
+        return lambda *args: self.commands.append((method, args))
+
+    def execute(self):
+        """Run the queued commands and return their results."""
+        return [method(*args) for method, args in self.commands]
+
+
+@pytest.fixture
+def redis_client():
+    """Create an empty fake Redis client.
+
+    Returns:
+        FakeRedis: A fresh fake client.
+    """
+    return FakeRedis()
+
+
+@pytest.fixture
+def redis_store(redis_client):
+    """Create a Redis session store backed by the fake client.
+
+    Args:
+        redis_client: The fake Redis client fixture.
+
+    Returns:
+        RedisSessionStore: A store with a 100 second TTL.
+    """
+    return RedisSessionStore(redis_client, ttl=100)
+
+
+@pytest.fixture
+def store():
+    """Create an empty in-memory session store.
+
+    Returns:
+        MemorySessionStore: A fresh store instance.
+    """
+    return MemorySessionStore()
+
+
+class TestMemorySessionStoreGenerators:
+    """Tests for generator storage."""
+
+    def test_get_generator_missing(self, store):
+        """Test that an unknown session has no generator.
+
+        Args:
+            store: The session store fixture.
+        """
+        assert store.get_generator('missing') is None
+
+    def test_save_and_get_generator(self, store):
+        """Test that a saved generator can be retrieved.
+
+        Args:
+            store: The session store fixture.
+        """
+        generator = StoryGenerator(seed=42)
+
+        store.save_generator('session-1', generator)
+
+        assert store.get_generator('session-1') is generator
+
+
+class TestMemorySessionStoreEviction:
+    """Tests for the bounded number of sessions."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unused session is evicted when full."""
+        store = MemorySessionStore(max_sessions=2)
+        store.save_generator('session-1', StoryGenerator(seed=1))
+        store.save_generator('session-2', StoryGenerator(seed=2))
+        store.get_generator('session-1')
+
+        store.save_generator('session-3', StoryGenerator(seed=3))
+
+        assert store.get_generator('session-1') is not None
+        assert store.get_generator('session-2') is None
+        assert store.get_generator('session-3') is not None
+
+    def test_eviction_drops_cached_state(self):
+        """Test that an evicted session loses its cached user."""
+        store = MemorySessionStore(max_sessions=1)
+        store.save_generator('session-1', StoryGenerator(seed=1))
+        store.set_user('session-1', {'id': 'user-1', 'session_id': 'session-1'})
+
+        store.save_generator('session-2', StoryGenerator(seed=2))
+
+        assert store.get_user('session-1') is None
+
+    def test_evicts_sessions_without_generator(self):
+        """Test that cached users count towards the session bound."""
+        store = MemorySessionStore(max_sessions=2)
+        for session_id in ('session-1', 'session-2', 'session-3'):
+            store.set_user(session_id, {'id': session_id, 'session_id': session_id})
+
+        assert store.get_user('session-1') is None
+        assert store.get_user('session-3') is not None
+
+    def test_eviction_covers_all_cached_state(self):
+        """Test that a session with only cached state is evicted whole."""
+        store = MemorySessionStore(max_sessions=1)
+        store.set_context('session-1', {'mood': 'dark'})
+        store.set_story('session-1', 0, 50, 0, b'{}')
+
+        store.set_user('session-2', {'id': 'user-2', 'session_id': 'session-2'})
+
+        assert store.get_context('session-1') is None
+        assert store.get_story('session-1', 50, 0) == (0, None)
+        assert store.get_generator('session-2') is None
+        assert store.get_user('session-2') is not None
+
+
+class TestMemorySessionStoreContexts:
+    """Tests for the cached context summaries."""
+
+    def test_set_and_get_context(self, store):
+        """Test that a cached context summary can be retrieved.
+
+        Args:
+            store: The session store fixture.
+        """
+        store.set_context('session-1', {'mood': 'dark'})
+
+        assert store.get_context('session-1') == {'mood': 'dark'}
+
+    def test_save_generator_invalidates_context(self, store):
+        """Test that saving a generator drops its cached summary.
+
+        Args:
+            store: The session store fixture.
+        """
+        store.set_context('session-1', {'mood': 'dark'})
+
+        store.save_generator('session-1', StoryGenerator(seed=42))
+
+        assert store.get_context('session-1') is None
+
+
+class TestMemorySessionStoreUsers:
+    """Tests for the cached user records."""
+
+    def test_set_and_get_user(self, store):
+        """Test that a cached user can be retrieved.
+
+        Args:
+            store: The session store fixture.
+        """
+        store.set_user('session-1', {'id': 'user-1', 'session_id': 'session-1'})
+
+        assert store.get_user('session-1')['id'] == 'user-1'
+
+    def test_invalidate_user(self, store):
+        """Test that invalidating drops the cached user.
+
+        Args:
+            store: The session store fixture.
+        """
+        store.set_user('session-1', {'id': 'user-1', 'session_id': 'session-1'})
+
+        store.invalidate_user('session-1')
+
+        assert store.get_user('session-1') is None
+
+    def test_clear(self, store):
+        """Test that clear removes generators and users.
+
+        Args:
+            store: The session store fixture.
+        """
+        store.save_generator('session-1', StoryGenerator(seed=42))
+        store.set_user('session-1', {'id': 'user-1', 'session_id': 'session-1'})
+
+        store.clear()
+
+        assert store.get_generator('session-1') is None
+        assert store.get_user('session-1') is None
+
+
+class TestMemorySessionStoreStories:
+    """Tests for the cached story responses."""
+
+    def test_get_story_missing(self, store):
+        """Test that an uncached page misses at version zero.
+
+        Args:
+            store: The session store fixture.
+        """
+        assert store.get_story('session-1', 50, 0) == (0, None)
+
+    def test_set_and_get_story(self, store):
+        """Test that a cached story response can be retrieved.
+
+        Args:
+            store: The session store fixture.
+        """
+        version, _ = store.get_story('session-1', 50, 0)
+        store.set_story('session-1', version, 50, 0, b'{}')
+
+        assert store.get_story('session-1', 50, 0) == (version, b'{}')
+
+    def test_invalidate_story(self, store):
+        """Test that invalidating hides responses cached before it.
+
+        Args:
+            store: The session store fixture.
+        """
+        version, _ = store.get_story('session-1', 50, 0)
+        store.invalidate_story('session-1')
+        store.set_story('session-1', version, 50, 0, b'{}')
+
+        assert store.get_story('session-1', 50, 0) == (version + 1, None)
+
+    def test_save_generator_invalidates_story(self, store):
+        """Test that saving a generator drops cached story responses.
+
+        Args:
+            store: The session store fixture.
+        """
+        version, _ = store.get_story('session-1', 50, 0)
+        store.set_story('session-1', version, 50, 0, b'{}')
+
+        store.save_generator('session-1', StoryGenerator(seed=42))
+
+        assert store.get_story('session-1', 50, 0)[1] is None
+
+    def test_invalidate_story_drops_old_pages(self, store):
+        """Test that pages of an older version are freed, not just hidden.
+
+        Args:
+            store: The session store fixture.
+        """
+        store.set_story('session-1', 0, 50, 0, b'{}')
+
+        store.invalidate_story('session-1')
+
+        assert 'session-1' not in store._stories
+
+    def test_pages_per_session_are_capped(self, store):
+        """Test that only the most recent pages of a session are kept.
+
+        Args:
+            store: The session store fixture.
+        """
+        for offset in range(MAX_STORY_PAGES + 1):
+            store.set_story('session-1', 0, 50, offset, b'{}')
+
+        assert store.get_story('session-1', 50, 0) == (0, None)
+        assert store.get_story('session-1', 50, MAX_STORY_PAGES) == (0, b'{}')
+        assert len(store._stories['session-1']) == MAX_STORY_PAGES
+
+
+class TestRedisSessionStore:
+    """Tests for the Redis-backed store."""
+
+    def test_get_generator_missing(self, redis_store):
+        """Test that an unknown session has no generator.
+
+        Args:
+            redis_store: The Redis session store fixture.
+        """
+        assert redis_store.get_generator('missing') is None
+
+    def test_generator_round_trip(self, redis_store, redis_client):
+        """Test that a saved generator is restored from its state.
+
+        Args:
+            redis_store: The Redis session store fixture.
+            redis_client: The fake Redis client fixture.
+        """
+        generator = StoryGenerator(seed=42)
+        generator.generate_opening()
+
+        redis_store.save_generator('session-1', generator)
+        restored = redis_store.get_generator('session-1')
+
+        assert restored is not generator
+        assert restored.get_state() == generator.get_state()
+        assert redis_client.ttls['gen:session-1'] == 100
+
+    def test_save_generator_drops_cached_state(self, redis_store, redis_client):
+        """Test that saving a generator drops the context and story pages.
+
+        Args:
+            redis_store: The Redis session store fixture.
+            redis_client: The fake Redis client fixture.
+        """
+        redis_store.set_context('session-1', {'mood': 'dark'})
+        version, _ = redis_store.get_story('session-1', 50, 0)
+        redis_store.set_story('session-1', version, 50, 0, b'{}')
+
+        redis_store.save_generator('session-1', StoryGenerator(seed=42))
+
+        assert redis_store.get_context('session-1') is None
+        assert redis_store.get_story('session-1', 50, 0) == (version + 1, None)
+        assert redis_client.ttls['story:session-1:version'] == 100
+
+    def test_set_and_get_context(self, redis_store):
+        """Test that a cached context summary can be retrieved.
+
+        Args:
+            redis_store: The Redis session store fixture.
+        """
+        redis_store.set_context('session-1', {'mood': 'dark'})
+
+        assert redis_store.get_context('session-1') == {'mood': 'dark'}
+
+    def test_story_pages_are_keyed_by_version(self, redis_store, redis_client):
+        """Test that story pages are stored per version and page.
+
+        Args:
+            redis_store: The Redis session store fixture.
+            redis_client: The fake Redis client fixture.
+        """
+        version, _ = redis_store.get_story('session-1', 50, 0)
+        redis_store.set_story('session-1', version, 50, 0, b'{"segments": []}')
+
+        assert redis_store.get_story('session-1', 50, 0) == (version, b'{"segments": []}')
+        assert redis_store.get_story('session-1', 50, 50) == (version, None)
+        assert f'story:session-1:{version}:50:0' in redis_client.data
+
+    def test_invalidate_story(self, redis_store):
+        """Test that invalidating hides responses cached before it.
+
+        Args:
+            redis_store: The Redis session store fixture.
+        """
+        version, _ = redis_store.get_story('session-1', 50, 0)
+        redis_store.set_story('session-1', version, 50, 0, b'{}')
+
+        redis_store.invalidate_story('session-1')
+
+        assert redis_store.get_story('session-1', 50, 0) == (version + 1, None)
+
+    def test_user_is_served_from_local_cache(self, redis_store, redis_client):
+        """Test that a user set by this process is read without Redis.
+
+        Args:
+            redis_store: The Redis session store fixture.
+            redis_client: The fake Redis client fixture.
+        """
+        redis_store.set_user('session-1', {'id': 'user-1', 'session_id': 'session-1'})
+        redis_client.data.clear()
+
+        assert redis_store.get_user('session-1')['id'] == 'user-1'
+
+    def test_user_is_read_through_from_redis(self, redis_client):
+        """Test that a user stored by another process is loaded and cached.
+
+        Args:
+            redis_client: The fake Redis client fixture.
+        """
+        RedisSessionStore(redis_client).set_user(
+            'session-1', {'id': 'user-1', 'session_id': 'session-1'})
+        store = RedisSessionStore(redis_client)
+
+        assert store.get_user('session-1')['id'] == 'user-1'
+        redis_client.data.clear()
+        assert store.get_user('session-1')['id'] == 'user-1'
+
+    def test_invalidate_user(self, redis_store, redis_client):
+        """Test that invalidating drops both the local and Redis copies.
+
+        Args:
+            redis_store: The Redis session store fixture.
+            redis_client: The fake Redis client fixture.
+        """
+        redis_store.set_user('session-1', {'id': 'user-1', 'session_id': 'session-1'})
+
+        redis_store.invalidate_user('session-1')
+
+        assert redis_store.get_user('session-1') is None
+        assert 'user:session-1' not in redis_client.data
+
+    def test_clear_only_deletes_store_keys(self, redis_store, redis_client):
+        """Test that clear removes session state but not unrelated keys.
+
+        Args:
+            redis_store: The Redis session store fixture.
+            redis_client: The fake Redis client fixture.
+        """
+        redis_client.setex('other', 100, b'keep')
+        redis_store.save_generator('session-1', StoryGenerator(seed=42))
+        redis_store.set_context('session-1', {'mood': 'dark'})
+        redis_store.set_user('session-1', {'id': 'user-1', 'session_id': 'session-1'})
+
+        redis_store.clear()
+
+        assert list(redis_client.data) == ['other']
+        assert redis_store.get_user('session-1') is None
+
+
+class TestCreateSessionStore:
+    """Tests for the store factory."""
+
+    def test_defaults_to_memory_store(self):
+        """Test that no Redis URL yields an in-memory store."""
+        assert isinstance(create_session_store(None), MemorySessionStore)
+
+    def test_redis_url_yields_redis_store(self):
+        """Test that a Redis URL yields a Redis store without connecting."""
+        store = create_session_store('redis://localhost:6379/0', ttl=100)
+
+        assert isinstance(store, RedisSessionStore)
+        assert store.ttl == 100
+
+
+class TestTTLCache:
+    """Tests for the expiring LRU cache."""
+
+    def test_set_and_get(self):
+        """Test that a stored value can be retrieved."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set('key', {'id': 1})
+
+        assert cache.get('key') == {'id': 1}
+
+    def test_expired_entry_misses(self):
+        """Test that an entry is gone once its TTL has passed."""
+        cache = TTLCache(maxsize=10, ttl=0)
+        cache.set('key', 'value')
+
+        assert cache.get('key') is None
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unused entry is evicted when full."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+
+        cache.set('c', 3)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+
+    def test_pop(self):
+        """Test that a popped entry misses."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set('key', 'value')
+
+        cache.pop('key')
+
+        assert cache.get('key') is None